@@ -1,102 +1,268 @@
-from datetime import datetime, timedelta, timezone
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+import asyncio
+import functools
+import hashlib
+import hmac
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import jwt
+from jwt import InvalidTokenError
+import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from bson import ObjectId
+from cachetools import TTLCache
 from .config import settings
 from .models import TokenData, User
-from .database import get_database
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from . import database as mongo
 
 # JWT Security
 security = HTTPBearer()
 
+# PyJWT (HMAC via cryptography) is used for HS256; encode the secret once instead of per call
+_SECRET_KEY_BYTES = settings.SECRET_KEY.encode("utf-8")
+# Hoisted decode arguments; tokens carry no aud/iss claims so those checks are skipped
+_JWT_ALGORITHMS = ["HS256"]
+_JWT_DECODE_OPTIONS = {"verify_aud": False, "verify_iss": False}
+
+_ACCESS_TOKEN_EXPIRE_SECONDS = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_REFRESH_TOKEN_EXPIRE_SECONDS = settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60
+
+# Only fetch the fields the User model needs (never password_hash) when resolving the current user
+_USER_PROJECTION = {name: 1 for name in User.model_fields if name != "id"}
+
+# Short-lived per-process cache of resolved users; routes that modify a user call invalidate_user()
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=10)
+_user_locks: Dict[str, asyncio.Lock] = {}
+
+# Verified JWT payloads for repeat requests and WebSocket reconnects; keyed by a digest so raw
+# tokens are not retained, and entries are also dropped once the token's own exp has passed
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
+# bcrypt only looks at the first 72 bytes of a password
+_BCRYPT_MAX_PASSWORD_BYTES = 72
+
+# Recent successful verifies keyed by an HMAC of (password, hash) so reconnect/resume bursts skip the KDF.
+# The stored hash is part of the key, so a password change naturally misses the old entries.
+# Failures are never cached, so every wrong guess still pays the full KDF.
+_verify_cache: TTLCache = TTLCache(maxsize=50_000, ttl=30)
+
+# Argon2 and bcrypt release the GIL while hashing, so one thread per core runs KDFs in parallel
+# without a process pool's pickling, and a login burst cannot starve the loop's default executor
+_HASH_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="pwhash")
+
+# New hashes are Argon2id; bcrypt is only kept to verify (and then upgrade) legacy hashes
+_PASSWORD_HASHER = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
+_ARGON2_PREFIX = "$argon2"
+
+
+def _password_bytes(password: str) -> bytes:
+    return password.encode("utf-8")[:_BCRYPT_MAX_PASSWORD_BYTES]
+
+
+def _hash_bytes(hashed_password: str) -> bytes:
+    # Accept legacy $2y$/$2x$ prefixes (PHP/older libs) by mapping them to the equivalent $2b$
+    if hashed_password.startswith(("$2y$", "$2x$")):
+        hashed_password = "$2b$" + hashed_password[4:]
+    return hashed_password.encode("utf-8")
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    if not hashed_password:
+        return False
+    if hashed_password.startswith(_ARGON2_PREFIX):
+        try:
+            return _PASSWORD_HASHER.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+    try:
+        return bcrypt.checkpw(_password_bytes(plain_password), _hash_bytes(hashed_password))
+    except ValueError:
+        # Malformed or non-bcrypt hash
+        return False
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return _PASSWORD_HASHER.hash(password)
+
+
+def password_hash_needs_update(hashed_password: str) -> bool:
+    """Check whether a stored hash is legacy bcrypt or uses outdated Argon2 parameters"""
+    if not hashed_password.startswith(_ARGON2_PREFIX):
+        return True
+    try:
+        return _PASSWORD_HASHER.check_needs_rehash(hashed_password)
+    except InvalidHashError:
+        return False
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing pool so bcrypt does not block the event loop"""
+    key = hmac.new(
+        _SECRET_KEY_BYTES,
+        plain_password.encode("utf-8") + b"\0" + hashed_password.encode("utf-8"),
+        hashlib.sha256,
+    ).digest()
+    if key in _verify_cache:
+        return True
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(_HASH_EXECUTOR, verify_password, plain_password, hashed_password)
+    if result:
+        _verify_cache[key] = True
+    return result
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing pool so bcrypt does not block the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_HASH_EXECUTOR, get_password_hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    # Integer epoch seconds; PyJWT accepts an int "exp" as-is
+    expire = int(time.time()) + (int(expires_delta.total_seconds()) if expires_delta else _ACCESS_TOKEN_EXPIRE_SECONDS)
 
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY_BYTES, algorithm="HS256")
     return encoded_jwt
 
 
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT refresh token"""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    # Integer epoch seconds; PyJWT accepts an int "exp" as-is
+    expire = int(time.time()) + (int(expires_delta.total_seconds()) if expires_delta else _REFRESH_TOKEN_EXPIRE_SECONDS)
 
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY_BYTES, algorithm="HS256")
     return encoded_jwt
 
 
 def verify_refresh_token(token: str) -> Optional[str]:
     """Verify refresh token and return user_id if valid"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        payload = jwt.decode(token, _SECRET_KEY_BYTES, algorithms=_JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS)
         token_type = payload.get("type")
         if token_type != "refresh":
             return None
         user_id = payload.get("sub")
         return str(user_id) if user_id else None
-    except JWTError:
+    except InvalidTokenError:
         return None
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
-    """Get current authenticated user"""
-    credentials_exception = HTTPException(
+def _decode_token(token: str) -> dict:
+    """Verify a JWT, reusing the payload of a recently verified identical token.
+
+    Raises InvalidTokenError like jwt.decode. Callers must treat the payload as read-only.
+    """
+    token_key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    payload = _token_cache.get(token_key)
+    if payload is not None:
+        if time.time() < payload["exp"]:
+            return payload
+        _token_cache.pop(token_key, None)
+
+    payload = jwt.decode(token, _SECRET_KEY_BYTES, algorithms=_JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS)
+    if isinstance(payload.get("exp"), (int, float)):
+        _token_cache[token_key] = payload
+    return payload
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+async def get_verified_payload(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Decode the bearer token once per request.
+
+    The verified payload is kept on ``request.state`` so other dependencies in the
+    same request reuse it instead of re-running the HMAC signature check.
+    """
+    token = credentials.credentials
+    cached = getattr(request.state, "_jwt_payload", None)
+    if cached is not None and cached[0] == token:
+        return cached[1]
+
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        token_data = TokenData(user_id=str(user_id))
-    except JWTError:
-        raise credentials_exception
-    
-    db = get_database()
-    if db is None:
+        payload = _decode_token(token)
+    except InvalidTokenError:
+        raise _credentials_exception()
+
+    request.state._jwt_payload = (token, payload)
+    return payload
+
+
+@functools.lru_cache(maxsize=8192)
+def _oid(user_id: str) -> ObjectId:
+    """Parse a user id once; ObjectId is immutable so repeat callers share the instance"""
+    return ObjectId(user_id)
+
+
+def invalidate_user(user_id: str) -> None:
+    """Drop a user from the in-process user cache after it has been modified"""
+    _user_cache.pop(str(user_id), None)
+
+
+async def _get_user_by_id(user_id: str) -> Optional[User]:
+    """Load a user by id, served from the short-TTL cache when possible"""
+    user = _user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    # Collapse concurrent misses for the same user into a single Mongo query
+    lock = _user_locks.setdefault(user_id, asyncio.Lock())
+    async with lock:
+        user = _user_cache.get(user_id)
+        if user is None:
+            user_doc = await mongo.database.users.find_one({"_id": _oid(user_id)}, _USER_PROJECTION)
+            if user_doc is not None:
+                # Convert ObjectId to string for Pydantic validation
+                user_doc["_id"] = str(user_doc["_id"])
+                user = User(**user_doc)
+                _user_cache[user_id] = user
+    if not lock.locked():
+        _user_locks.pop(user_id, None)
+    return user
+
+
+async def get_current_user(payload: dict = Depends(get_verified_payload)) -> User:
+    """Get current authenticated user"""
+    credentials_exception = _credentials_exception()
+
+    user_id = payload.get("sub")
+    if user_id is None:
         raise credentials_exception
-    from bson import ObjectId
-    user_doc = await db.users.find_one({"_id": ObjectId(token_data.user_id)})
-    if user_doc is None:
+    token_data = TokenData(user_id=str(user_id))
+
+    user = await _get_user_by_id(token_data.user_id)
+    if user is None:
         raise credentials_exception
-    
-    # Convert ObjectId to string for Pydantic validation
-    user_doc["_id"] = str(user_doc["_id"])
-    return User(**user_doc)
+    return user
+
+
 async def get_current_user_ws(token: str) -> Optional[User]:
     """Get current authenticated user for WebSocket connections"""
+    # Reconnecting clients present the same token repeatedly; _decode_token skips the HMAC for them
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        payload = _decode_token(token)
 
         token_type = payload.get("type")
         if token_type != "access":
@@ -108,38 +274,31 @@ async def get_current_user_ws(token: str) -> Optional[User]:
 
         token_data = TokenData(user_id=str(user_id))
 
-    except JWTError:
+    except InvalidTokenError:
         return None
 
-    db = get_database()
-    if db is None:
-        return None
-
-    from bson import ObjectId
-    user_doc = await db.users.find_one({"_id": ObjectId(token_data.user_id)})
-    if user_doc is None:
-        return None
-
-    # Convert ObjectId to string for Pydantic validation
-    user_doc["_id"] = str(user_doc["_id"])
-    user = User(**user_doc)
-
-    return user
+    # The user lookup itself stays behind _get_user_by_id so invalidate_user() still applies
+    return await _get_user_by_id(token_data.user_id)
 
 
 async def authenticate_user(email: str, password: str) -> Optional[User]:
     """Authenticate user by email and password"""
-    db = get_database()
-    if db is None:
-        return None
-    user_doc = await db.users.find_one({"email": email})
+    user_doc = await mongo.database.users.find_one({"email": email})
     if not user_doc:
         return None
     
     # Convert ObjectId to string for Pydantic validation
     user_doc["_id"] = str(user_doc["_id"])
     user = User(**user_doc)
-    if not verify_password(password, user_doc.get("password_hash", "")):
+    password_hash = user_doc.get("password_hash", "")
+    if not await verify_password_async(password, password_hash):
         return None
-    
+
+    # Transparently upgrade bcrypt hashes, or Argon2 hashes made with older parameters
+    if password_hash_needs_update(password_hash):
+        await mongo.database.users.update_one(
+            {"_id": user.id},
+            {"$set": {"password_hash": await get_password_hash_async(password)}}
+        )
+
     return user
\ No newline at end of file
@@ -1,28 +1,76 @@
+import asyncio
+import hashlib
 from typing import Any, Optional
+import orjson
+from cachetools import TTLCache
 from .config import settings
 from urllib.parse import urlparse
 
 # Import aiocache with fallback handling
 try:
     from aiocache import caches  # type: ignore
+    from aiocache.serializers import BaseSerializer  # type: ignore
     AIOCACHE_AVAILABLE = True
 except ImportError:
     AIOCACHE_AVAILABLE = False
     caches = None  # type: ignore
+    BaseSerializer = object  # type: ignore
+
+
+def _dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_NAIVE_UTC)
+
+
+class OrjsonSerializer(BaseSerializer):  # type: ignore
+    """aiocache serializer backed by orjson.
+
+    Values are stored as raw JSON bytes (encoding=None), so Redis payloads skip
+    the str <-> bytes round-trip. Naive datetimes are serialized as UTC.
+    """
+
+    DEFAULT_ENCODING = None
+
+    def dumps(self, value):
+        return _dumps(value)
+
+    def loads(self, value):
+        if value is None:
+            return None
+        return orjson.loads(value)
 
 
 class CacheManager:
-    """Cache manager with Redis and in-memory fallback"""
+    """Cache manager with Redis and in-memory fallback.
+
+    Hot keys are also kept in a small in-process L1 cache with a short TTL
+    (``default_l1_ttl`` seconds) so repeated reads skip the Redis round-trip.
+    L1 holds the same orjson bytes as L2 and decodes them per read, so every hit
+    returns a fresh object of the same types whichever layer answered.
+    """
 
-    def __init__(self):
+    def __init__(self, default_l1_ttl: float = 1.0, l1_maxsize: int = 10_000):
         self.cache: Optional[Any] = None
         self._initialized = False
+        self._l1: TTLCache = TTLCache(maxsize=l1_maxsize, ttl=default_l1_ttl)
+        # Created lazily so the lock binds to the running event loop
+        self._init_lock: Optional[asyncio.Lock] = None
 
     async def initialize(self):
-        """Initialize cache with Redis or fallback to memory"""
+        """Initialize cache with Redis or fallback to memory.
+
+        Safe to call concurrently: only the first caller configures the backend.
+        """
         if self._initialized:
             return
 
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        async with self._init_lock:
+            if self._initialized:
+                return
+            await self._setup()
+
+    async def _setup(self):
         if not AIOCACHE_AVAILABLE:
             print("aiocache not available, cache disabled")
             self._initialized = True
@@ -66,7 +114,7 @@ class CacheManager:
                         'endpoint': endpoint,
                         'port': port,
                         'serializer': {
-                            'class': "aiocache.serializers.JsonSerializer"
+                            'class': OrjsonSerializer
                         },
                         'ttl': settings.CACHE_TTL
                     }
@@ -74,11 +122,13 @@ class CacheManager:
                 # Optional auth if password provided
                 if password:
                     config['default']['password'] = password  # type: ignore
+                if settings.CACHE_NAMESPACE:
+                    config['default']['namespace'] = settings.CACHE_NAMESPACE  # type: ignore
 
                 caches.set_config(config)  # type: ignore
                 self.cache = caches.get('default')  # type: ignore
-                if self.cache:
-                    await self.cache.clear()  # type: ignore
+                # No clear() here: flushing on boot would wipe the shared cache for every worker.
+                # Use CACHE_NAMESPACE to isolate deploys instead.
                 print("Redis cache initialized")
             else:
                 raise Exception("Cache disabled or aiocache not available")
@@ -92,7 +142,7 @@ class CacheManager:
                         'default': {
                             'cache': "aiocache.SimpleMemoryCache",
                             'serializer': {
-                                'class': "aiocache.serializers.JsonSerializer"
+                                'class': OrjsonSerializer
                             },
                             'ttl': settings.CACHE_TTL
                         }
@@ -114,10 +164,17 @@ class CacheManager:
         if not self.cache:
             return None
 
+        raw = self._l1.get(key)
+        if raw is not None:
+            return orjson.loads(raw)
+
         try:
-            return await self.cache.get(key)  # type: ignore
+            value = await self.cache.get(key)  # type: ignore
         except Exception:
             return None
+        if value is not None:
+            self._l1[key] = _dumps(value)
+        return value
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in cache"""
@@ -129,8 +186,10 @@ class CacheManager:
 
         try:
             await self.cache.set(key, value, ttl=ttl or settings.CACHE_TTL)  # type: ignore
+            self._l1[key] = _dumps(value)
             return True
         except Exception:
+            self._l1.pop(key, None)
             return False
 
     async def delete(self, key: str) -> bool:
@@ -141,6 +200,7 @@ class CacheManager:
         if not self.cache:
             return False
 
+        self._l1.pop(key, None)
         try:
             await self.cache.delete(key)  # type: ignore
             return True
@@ -155,6 +215,7 @@ class CacheManager:
         if not self.cache:
             return False
 
+        self._l1.clear()
         try:
             await self.cache.clear()  # type: ignore
             return True
@@ -175,8 +236,24 @@ class CacheManager:
 cache_manager = CacheManager()
 
 
+def _stable_hash(value: Any) -> str:
+    """Content hash that is identical across processes (unlike the salted built-in hash())"""
+    if isinstance(value, (dict, list, tuple)):
+        data = orjson.dumps(value, option=orjson.OPT_SORT_KEYS, default=str)
+    else:
+        data = repr(value).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+_SCALAR_TYPES = (str, int, float, bool)
+
+
 def get_cache_key(prefix: str, *args, **kwargs) -> str:
     """Generate cache key from prefix and arguments"""
+    # Fast path: only scalar positional args (the common decorator case)
+    if not kwargs and all(type(arg) in _SCALAR_TYPES for arg in args):
+        return ":".join((prefix, *map(str, args))) if args else prefix
+
     key_parts = [prefix]
 
     # Add positional arguments
@@ -184,14 +261,14 @@ def get_cache_key(prefix: str, *args, **kwargs) -> str:
         if isinstance(arg, (str, int, float, bool)):
             key_parts.append(str(arg))
         else:
-            key_parts.append(str(hash(str(arg))))
+            key_parts.append(_stable_hash(arg))
 
     # Add keyword arguments (sorted for consistency)
     for k, v in sorted(kwargs.items()):
         if isinstance(v, (str, int, float, bool)):
             key_parts.append(f"{k}:{v}")
         else:
-            key_parts.append(f"{k}:{hash(str(v))}")
+            key_parts.append(f"{k}:{_stable_hash(v)}")
 
     return ":".join(key_parts)
 
@@ -200,9 +277,18 @@ def get_cache_key(prefix: str, *args, **kwargs) -> str:
 def cache_response(ttl: Optional[int] = None, key_prefix: str = "api"):
     """Decorator to cache API responses"""
     def decorator(func):
+        # Constant per wrapped function, so build it once
+        func_prefix = f"{key_prefix}:{func.__name__}"
+
         async def wrapper(*args, **kwargs):
+            if not cache_manager._initialized:
+                await cache_manager.initialize()
+            # Cache unavailable: skip key building entirely
+            if cache_manager.cache is None:
+                return await func(*args, **kwargs)
+
             # Generate cache key
-            cache_key = get_cache_key(key_prefix, func.__name__, *args, **kwargs)
+            cache_key = get_cache_key(func_prefix, *args, **kwargs)
 
             # Try to get from cache first
             cached_result = await cache_manager.get(cache_key)
@@ -224,6 +310,10 @@ def cache_response(ttl: Optional[int] = None, key_prefix: str = "api"):
 def invalidate_cache(key_prefix: str = "api", *key_args, **key_kwargs):
     """Invalidate cache entries"""
     async def invalidate():
+        if not cache_manager._initialized:
+            await cache_manager.initialize()
+        if cache_manager.cache is None:
+            return
         cache_key = get_cache_key(key_prefix, *key_args, **key_kwargs)
         await cache_manager.delete(cache_key)
     return invalidate
\ No newline at end of file
@@ -1,7 +1,8 @@
 import os
 import logging
-from typing import List
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Annotated, List
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 from pathlib import Path
 import json
 
@@ -21,6 +22,8 @@ class Settings(BaseSettings):
     ENV: str = app_env  # Use app_env instead of default "dev"
     PROJECT_NAME: str = "Loom"
     API_V1_STR: str = "/api"
+    # Debug-only diagnostics (e.g. the X-Process-Time response header)
+    DEBUG: bool = False
     SECRET_KEY: str = "your-super-secure-secret-key-change-this-in-production-12345678901234567890"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480  # 8 hours for development/testing
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
@@ -31,6 +34,11 @@ class Settings(BaseSettings):
     PASSWORD_REQUIRE_LOWERCASE: bool = True
     PASSWORD_REQUIRE_DIGITS: bool = True
     PASSWORD_REQUIRE_SPECIAL_CHARS: bool = False  # Temporarily disabled for development
+    # Argon2id cost for new password hashes (OWASP baseline: t=2, m=19 MiB, p=1);
+    # lowered in development so logins/tests stay fast. Legacy bcrypt hashes are upgraded on login.
+    ARGON2_TIME_COST: int = 1 if app_env in {"dev", "development"} else 2
+    ARGON2_MEMORY_COST: int = 1024 if app_env in {"dev", "development"} else 19456  # KiB
+    ARGON2_PARALLELISM: int = 1
 
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = 100  # requests per window
@@ -41,13 +49,18 @@ class Settings(BaseSettings):
     CACHE_TTL: int = 300  # 5 minutes default TTL
     CACHE_REDIS_URL: str = "redis://localhost:6379"
     CACHE_MAX_MEMORY: str = "100mb"
+    CACHE_NAMESPACE: str = ""  # Optional key prefix (e.g. release SHA) to isolate deploys
 
     # MongoDB
     MONGO_URI: str = "mongodb://127.0.0.1:27017"
     MONGO_DB: str = "loom"
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_COMPRESSORS: str = "zstd,snappy,zlib"  # zstd/snappy need the pymongo[zstd,snappy] extras
 
     # CORS
-    CORS_ORIGINS: List[str] = ["http://localhost:7100", "http://localhost:7500"]
+    # NoDecode: the raw env string is handed to _parse_cors_origins (JSON list or comma-separated)
+    CORS_ORIGINS: Annotated[List[str], NoDecode] = ["http://localhost:7100", "http://localhost:7500"]
 
     # Frontend base URL (used to generate absolute links like partner invites)
     FRONTEND_BASE_URL: str = "http://localhost:7100"
@@ -81,23 +94,17 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # Parse CORS_ORIGINS from environment if it's a string
-        cors_env = os.getenv("CORS_ORIGINS")
-        if cors_env and isinstance(cors_env, str):
+    @field_validator("CORS_ORIGINS", mode="before")
+    @classmethod
+    def _parse_cors_origins(cls, value):
+        """Accept CORS_ORIGINS as a JSON list or a comma-separated string"""
+        if isinstance(value, str):
             try:
-                # Try to parse as JSON first
-                parsed_origins = json.loads(cors_env)
-                # Ensure it's a list of strings
-                if isinstance(parsed_origins, list):
-                    object.__setattr__(self, 'CORS_ORIGINS', parsed_origins)
-                else:
-                    object.__setattr__(self, 'CORS_ORIGINS', [str(parsed_origins)])
+                parsed_origins = json.loads(value)
             except json.JSONDecodeError:
-                # If that fails, split by comma and strip whitespace
-                object.__setattr__(self, 'CORS_ORIGINS', [origin.strip() for origin in cors_env.split(",")])
-
+                return [origin.strip() for origin in value.split(",")]
+            return parsed_origins if isinstance(parsed_origins, list) else [str(parsed_origins)]
+        return value
 
 
 settings = Settings()
\ No newline at end of file
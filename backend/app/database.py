@@ -1,12 +1,31 @@
+import asyncio
 from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ServerSelectionTimeoutError
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
 from .config import settings
 
 # MongoDB client and database instances
 client: Optional[AsyncIOMotorClient] = None
 database = None
 
+# Indexes the baseline release created that the set below replaces (a compound index covers them or
+# nothing queries by them); dropped at startup so existing deployments stop paying their write cost
+_SUPERSEDED_INDEXES = {
+    "users": ("email_1_is_onboarded_1",),
+    "events": (
+        "created_by_1",
+        "attendees_1",
+        "start_time_1",
+        "created_by_1_start_time_-1",
+        "attendees_1_start_time_-1",
+    ),
+    "tasks": ("created_by_1",),
+    "proposals": ("proposed_to_1",),
+}
+# Server error codes for a missing index / collection, i.e. already dropped
+_INDEX_ALREADY_GONE = (26, 27)
+
 
 async def connect_to_mongo():
     """Create optimized database connection with connection pooling"""
@@ -15,17 +34,26 @@ async def connect_to_mongo():
     # Connection options for performance
     client = AsyncIOMotorClient(
         settings.MONGO_URI,
-        maxPoolSize=10,          # Maximum connection pool size
-        minPoolSize=5,           # Minimum connection pool size
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,  # Maximum connection pool size
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,  # Minimum connection pool size
         maxIdleTimeMS=30000,     # Close connections after 30 seconds of inactivity
         serverSelectionTimeoutMS=5000,  # Timeout after 5 seconds instead of 30
         connectTimeoutMS=5000,   # Connection timeout
         socketTimeoutMS=5000,    # Socket timeout
         waitQueueTimeoutMS=5000, # Wait queue timeout
+        compressors=settings.MONGO_COMPRESSORS,  # Wire compression, negotiated with the server
+        zlibCompressionLevel=6,
+        retryReads=True,
+        retryWrites=True,
     )
 
     database = client[settings.MONGO_DB]
-    print(f"Connected to MongoDB at {settings.MONGO_URI}/{settings.MONGO_DB}")
+    # The client connects lazily; a ping does server selection and the first connection handshake
+    # (TLS/auth) now, so the first request doesn't pay for it while minPoolSize fills in the background
+    if not await ping_database():
+        print(f"MongoDB at {settings.MONGO_URI} did not answer the startup ping")
+    else:
+        print(f"Connected to MongoDB at {settings.MONGO_URI}/{settings.MONGO_DB}")
 
     # Create database indexes for performance
     await create_database_indexes()
@@ -36,38 +64,84 @@ async def create_database_indexes():
     if database is None:
         return
 
-    try:
+    # One createIndexes command per collection, all collections in parallel.
+    # background=True keeps builds from blocking on servers older than 4.2 (ignored on newer ones).
+    # Single-field indexes that are a prefix of a compound index below are intentionally omitted:
+    # the compound index serves those queries and each extra index is write amplification.
+    indexes = {
         # Users collection indexes
-        await database.users.create_index("email", unique=True)
-        await database.users.create_index("created_at")
-        await database.users.create_index([("email", 1), ("is_onboarded", 1)])
-
+        "users": [
+            IndexModel([("email", 1)], unique=True, background=True),
+            IndexModel([("created_at", 1)], background=True),
+        ],
         # Events collection indexes
-        await database.events.create_index("created_by")
-        await database.events.create_index("attendees")
-        await database.events.create_index("start_time")
-        await database.events.create_index("end_time")
-        await database.events.create_index([("created_by", 1), ("start_time", -1)])
-        await database.events.create_index([("attendees", 1), ("start_time", -1)])
-        await database.events.create_index([("start_time", 1), ("end_time", 1)])
-
+        "events": [
+            IndexModel([("end_time", 1)], background=True),
+            # Trailing end_time lets overlap queries (start_time < x, end_time > y) reject past
+            # events from index keys instead of fetching every historical document
+            IndexModel([("created_by", 1), ("start_time", 1), ("end_time", 1)], background=True),
+            IndexModel([("attendees", 1), ("start_time", 1), ("end_time", 1)], background=True),
+            IndexModel([("start_time", 1), ("end_time", 1)], background=True),
+        ],
+        # Event sub-resources: listed per event in creation order (messages are paged by _id)
+        "event_messages": [
+            IndexModel([("event_id", 1), ("_id", 1)], background=True),
+        ],
+        "event_checklist_items": [
+            IndexModel([("event_id", 1), ("created_at", 1)], background=True),
+        ],
         # Tasks collection indexes
-        await database.tasks.create_index("created_by")
-        await database.tasks.create_index("completed")
-        await database.tasks.create_index("due_date")
-        await database.tasks.create_index([("created_by", 1), ("completed", 1)])
-        await database.tasks.create_index([("created_by", 1), ("due_date", 1)])
-
+        "tasks": [
+            IndexModel([("completed", 1)], background=True),
+            IndexModel([("due_date", 1)], background=True),
+            IndexModel([("created_by", 1), ("completed", 1)], background=True),
+            IndexModel([("created_by", 1), ("due_date", 1)], background=True),
+        ],
         # Proposals collection indexes
-        await database.proposals.create_index("proposed_by")
-        await database.proposals.create_index("proposed_to")
-        await database.proposals.create_index("status")
-        await database.proposals.create_index([("proposed_to", 1), ("status", 1)])
+        "proposals": [
+            IndexModel([("proposed_by", 1)], background=True),
+            IndexModel([("status", 1)], background=True),
+            IndexModel([("proposed_to", 1), ("status", 1)], background=True),
+        ],
+        # Notification log; unique so a reminder insert doubles as its own dedupe check
+        "notification_events": [
+            IndexModel([("user_id", 1), ("dedupe_key", 1)], unique=True, background=True),
+        ],
+    }
+    results = await asyncio.gather(
+        *(database[name].create_indexes(models) for name, models in indexes.items()),
+        return_exceptions=True,
+    )
+    failed = set()
+    for name, result in zip(indexes, results):
+        if isinstance(result, Exception):
+            failed.add(name)
+            print(f"Error creating {name} indexes: {result}")
+
+    # Superseded indexes are dropped on every collection whose replacements now exist; a collection
+    # whose create failed keeps its old indexes so its queries are never left without one
+    drops = await asyncio.gather(
+        *(
+            _drop_index_if_exists(database[name], index_name)
+            for name, index_names in _SUPERSEDED_INDEXES.items() if name not in failed
+            for index_name in index_names
+        ),
+        return_exceptions=True,
+    )
+    for result in drops:
+        if isinstance(result, Exception):
+            print(f"Error dropping superseded index: {result}")
 
+    if not failed:
         print("Database indexes created successfully")
 
-    except Exception as e:
-        print(f"Error creating database indexes: {e}")
+
+async def _drop_index_if_exists(collection, name: str):
+    try:
+        await collection.drop_index(name)
+    except OperationFailure as e:
+        if e.code not in _INDEX_ALREADY_GONE:
+            raise
 
 
 async def close_mongo_connection():
@@ -1,58 +1,38 @@
-from typing import Optional
-from aiosmtplib import SMTP
+import asyncio
+import html
+import logging
+import re
+import ssl
+from typing import List, Optional, Set, Tuple
+from aiosmtplib import SMTP, SMTPServerDisconnected
 from email.message import EmailMessage
+from email.policy import default as _default_policy
+from jinja2 import DictLoader, Environment, FileSystemBytecodeCache
 
 from .config import settings
 
+logger = logging.getLogger(__name__)
 
-async def send_email(to_email: str, subject: str, body_text: str, body_html: Optional[str] = None) -> bool:
-    """Send an email using SMTP settings. Returns True if attempted successfully.
-    If SMTP is not configured, returns False gracefully.
-    """
-    # Use settings directly - these are loaded from .env at runtime
-    smtp_host = getattr(settings, 'SMTP_HOST', '')
-    email_from = getattr(settings, 'EMAIL_FROM', '')
+# SMTP settings are read once at import instead of on every send
+_SMTP = (
+    settings.SMTP_HOST,
+    settings.EMAIL_FROM,
+    settings.SMTP_PORT,
+    settings.SMTP_USE_TLS,
+    settings.SMTP_USERNAME,
+    settings.SMTP_PASSWORD,
+)
 
-    if not smtp_host or not email_from:
-        return False
+# Parsed once; EmailMessage accepts a prebuilt header object without re-parsing the address
+_FROM_HEADER = _default_policy.header_factory("From", _SMTP[1]) if _SMTP[1] else None
 
-    msg = EmailMessage()
-    msg["From"] = email_from
-    msg["To"] = to_email
-    msg["Subject"] = subject
-    msg.set_content(body_text)
-    if body_html:
-        msg.add_alternative(body_html, subtype="html")
+# One TLS context for every SMTP connection so the CA bundle is loaded once, not per handshake
+_TLS_CONTEXT = ssl.create_default_context()
 
-    try:
-        # Get SMTP settings with fallbacks
-        smtp_port = getattr(settings, 'SMTP_PORT', 587)
-        smtp_use_tls = getattr(settings, 'SMTP_USE_TLS', True)
-        smtp_username = getattr(settings, 'SMTP_USERNAME', '')
-        smtp_password = getattr(settings, 'SMTP_PASSWORD', '')
+_INVITE_SUBJECT = "{inviter_name} invited you to join Loom"
 
-        # Use implicit TLS if connecting to SMTPS port (465). Otherwise, optionally upgrade via STARTTLS.
-        implicit_tls = smtp_port == 465
-        async with SMTP(hostname=smtp_host, port=smtp_port, use_tls=implicit_tls) as client:
-            if smtp_use_tls and not implicit_tls:
-                await client.starttls()
-            if smtp_username and smtp_password:
-                await client.login(smtp_username, smtp_password)
-            await client.send_message(msg)
-        return True
-    except Exception:
-        return False
-
-
-def create_partnership_invitation_email(inviter_name: str, invitee_email: str, invitation_link: str) -> tuple[str, str]:
-    """Create email content for partnership invitation.
-
-    Returns:
-        tuple: (subject, html_body)
-    """
-    subject = f"{inviter_name} invited you to join Loom"
-
-    html_body = f"""
+# Invitation templates are compiled once at import; autoescape guards the user-supplied inviter name
+_INVITE_HTML_SRC = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -60,7 +40,7 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>Join Loom</title>
         <style>
-            body {{
+            body {
                 font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
                 line-height: 1.6;
                 color: #1f2937;
@@ -69,8 +49,8 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
                 padding: 20px;
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 min-height: 100vh;
-            }}
-            .container {{
+            }
+            .container {
                 background: white;
                 padding: 50px 40px;
                 border-radius: 20px;
@@ -78,8 +58,8 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
                 margin: 40px auto;
                 position: relative;
                 overflow: hidden;
-            }}
-            .container::before {{
+            }
+            .container::before {
                 content: '';
                 position: absolute;
                 top: 0;
@@ -87,13 +67,13 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
                 right: 0;
                 height: 4px;
                 background: linear-gradient(90deg, #667eea, #764ba2, #f093fb, #f5576c);
-            }}
-            .header {{
+            }
+            .header {
                 text-align: center;
                 margin-bottom: 40px;
                 position: relative;
-            }}
-            .logo {{
+            }
+            .logo {
                 width: 80px;
                 height: 80px;
                 margin: 0 auto 20px;
@@ -108,13 +88,13 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
                 font-size: 32px;
                 font-weight: bold;
                 text-decoration: none;
-            }}
-            .logo img {{
+            }
+            .logo img {
                 width: 100%;
                 height: 100%;
                 border-radius: 16px;
-            }}
-            .logo-text {{
+            }
+            .logo-text {
                 background: linear-gradient(135deg, #667eea 0%, #764ba2);
                 -webkit-background-clip: text;
                 -webkit-text-fill-color: transparent;
@@ -123,8 +103,8 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
                 font-weight: 700;
                 margin-bottom: 10px;
                 letter-spacing: -0.5px;
-            }}
-            .app-name {{
+            }
+            .app-name {
                 font-size: 32px;
                 font-weight: 700;
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -133,22 +113,22 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
                 background-clip: text;
                 margin-bottom: 10px;
                 letter-spacing: -0.5px;
-            }}
-            .tagline {{
+            }
+            .tagline {
                 font-size: 16px;
                 color: #6b7280;
                 margin-bottom: 0;
                 font-weight: 400;
-            }}
-            .invitation-card {{
+            }
+            .invitation-card {
                 background: #f8fafc;
                 border-radius: 16px;
                 padding: 30px;
                 margin: 30px 0;
                 border: 1px solid #e5e7eb;
                 position: relative;
-            }}
-            .invitation-card::before {{
+            }
+            .invitation-card::before {
                 content: '💌';
                 position: absolute;
                 top: -15px;
@@ -158,44 +138,44 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
                 border-radius: 50%;
                 box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
                 font-size: 20px;
-            }}
-            .invitation-text {{
+            }
+            .invitation-text {
                 font-size: 20px;
                 margin: 20px 0 25px 0;
                 color: #1f2937;
                 line-height: 1.5;
-            }}
-            .inviter-name {{
+            }
+            .inviter-name {
                 color: #667eea;
                 font-weight: 600;
                 font-size: 24px;
-            }}
-            .description {{
+            }
+            .description {
                 font-size: 16px;
                 color: #4b5563;
                 margin: 25px 0;
                 line-height: 1.6;
-            }}
-            .features {{
+            }
+            .features {
                 display: flex;
                 justify-content: space-around;
                 margin: 30px 0;
                 text-align: center;
-            }}
-            .feature {{
+            }
+            .feature {
                 flex: 1;
                 padding: 0 10px;
-            }}
-            .feature-icon {{
+            }
+            .feature-icon {
                 font-size: 28px;
                 margin-bottom: 8px;
-            }}
-            .feature-text {{
+            }
+            .feature-text {
                 font-size: 14px;
                 color: #6b7280;
                 font-weight: 500;
-            }}
-            .cta-button {{
+            }
+            .cta-button {
                 display: inline-block;
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 color: white;
@@ -209,12 +189,12 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
                 transition: all 0.3s ease;
                 text-align: center;
                 min-width: 200px;
-            }}
-            .cta-button:hover {{
+            }
+            .cta-button:hover {
                 transform: translateY(-2px);
                 box-shadow: 0 12px 28px rgba(102, 126, 234, 0.4);
-            }}
-            .fallback-link {{
+            }
+            .fallback-link {
                 font-size: 14px;
                 color: #6b7280;
                 margin-top: 20px;
@@ -223,8 +203,8 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
                 padding: 15px;
                 border-radius: 8px;
                 border: 1px solid #e5e7eb;
-            }}
-            .footer {{
+            }
+            .footer {
                 margin-top: 40px;
                 padding-top: 30px;
                 border-top: 2px solid #f3f4f6;
@@ -232,8 +212,8 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
                 color: #6b7280;
                 text-align: center;
                 position: relative;
-            }}
-            .footer::before {{
+            }
+            .footer::before {
                 content: '';
                 position: absolute;
                 top: -2px;
@@ -242,12 +222,12 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
                 width: 60px;
                 height: 2px;
                 background: linear-gradient(90deg, #667eea, #764ba2);
-            }}
-            .highlight {{
+            }
+            .highlight {
                 color: #667eea;
                 font-weight: 600;
-            }}
-            .security-note {{
+            }
+            .security-note {
                 background: #fef3c7;
                 border: 1px solid #f59e0b;
                 border-radius: 8px;
@@ -255,21 +235,21 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
                 margin: 20px 0;
                 font-size: 14px;
                 color: #92400e;
-            }}
-            @media (max-width: 480px) {{
-                .container {{
+            }
+            @media (max-width: 480px) {
+                .container {
                     padding: 30px 20px;
                     margin: 20px;
-                }}
-                .features {{
+                }
+                .features {
                     flex-direction: column;
                     gap: 20px;
-                }}
-                .cta-button {{
+                }
+                .cta-button {
                     width: 100%;
                     box-sizing: border-box;
-                }}
-            }}
+                }
+            }
         </style>
     </head>
     <body>
@@ -284,7 +264,7 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
 
             <div class="invitation-card">
                 <div class="invitation-text">
-                    <span class="inviter-name">{inviter_name}</span> has invited you to join <span class="highlight">Loom</span>!
+                    <span class="inviter-name">{{ inviter_name }}</span> has invited you to join <span class="highlight">Loom</span>!
                 </div>
 
                 <div class="description">
@@ -309,7 +289,7 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
             </div>
 
             <div style="text-align: center;">
-                <a href="{invitation_link}" class="cta-button">
+                <a href="{{ invitation_link }}" class="cta-button">
                     ✨ Accept Invitation
                 </a>
             </div>
@@ -317,7 +297,7 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
             <div class="fallback-link">
                 <strong>If the button doesn't work:</strong><br>
                 Copy and paste this link into your browser:<br>
-                <a href="{invitation_link}" style="color: #667eea; word-break: break-all;">{invitation_link}</a>
+                <a href="{{ invitation_link }}" style="color: #667eea; word-break: break-all;">{{ invitation_link }}</a>
             </div>
 
             <div class="security-note">
@@ -336,27 +316,248 @@ def create_partnership_invitation_email(inviter_name: str, invitee_email: str, i
     </html>
     """
 
+# Plain-text body needs no escaping, so a format string is enough
+_INVITE_TEXT = (
+    "{inviter_name} has invited you to join Loom!\n\n"
+    "Loom helps couples coordinate their schedules, share events, and stay connected.\n\n"
+    "Accept the invitation here: {invitation_link}\n\n"
+    "This invitation will expire in 7 days."
+)
+
+# Compiled template bytecode is cached on disk so restarted workers skip the Jinja parse/compile
+_TEMPLATE_ENV = Environment(
+    loader=DictLoader({"invite.html": _INVITE_HTML_SRC}),
+    autoescape=True,
+    bytecode_cache=FileSystemBytecodeCache(pattern="loom_jinja2_%s.cache"),
+)
+_INVITE_HTML_TEMPLATE = _TEMPLATE_ENV.get_template("invite.html")
+
+
+class SMTPPool:
+    """Small pool of persistent SMTP connections so each send skips the TCP/TLS/AUTH handshake"""
+
+    def __init__(self, size: int = 5, max_messages_per_connection: int = 100):
+        self.size = size
+        self.max_messages_per_connection = max_messages_per_connection
+        # Each slot holds (client or None, messages sent on that client)
+        self._slots: Optional[asyncio.Queue] = None
+
+    def _queue(self) -> asyncio.Queue:
+        if self._slots is None:
+            # LIFO so the most recently used (still warm) connection is handed out first
+            self._slots = asyncio.LifoQueue(maxsize=self.size)
+            for _ in range(self.size):
+                self._slots.put_nowait((None, 0))
+        return self._slots
+
+    async def _connect(self) -> SMTP:
+        smtp_host, _, smtp_port, smtp_use_tls, smtp_username, smtp_password = _SMTP
+
+        # Use implicit TLS if connecting to SMTPS port (465). Otherwise, optionally upgrade via STARTTLS.
+        implicit_tls = smtp_port == 465
+        client = SMTP(hostname=smtp_host, port=smtp_port, use_tls=implicit_tls, start_tls=False,
+                      tls_context=_TLS_CONTEXT)
+        try:
+            await client.connect()
+            if smtp_use_tls and not implicit_tls:
+                await client.starttls(tls_context=_TLS_CONTEXT)
+            if smtp_username and smtp_password:
+                await client.login(smtp_username, smtp_password)
+        except BaseException:
+            # A half-open connection (failed or cancelled handshake) never reaches the pool
+            client.close()
+            raise
+        return client
+
+    @staticmethod
+    async def _discard(client: Optional[SMTP]) -> None:
+        if client is None or not client.is_connected:
+            return
+        try:
+            await client.quit()
+        except Exception:
+            client.close()
+
+    async def send_message(self, msg: EmailMessage) -> None:
+        queue = self._queue()
+        slot: Tuple[Optional[SMTP], int] = await queue.get()
+        client, sent = slot
+        try:
+            if client is None or not client.is_connected or sent >= self.max_messages_per_connection:
+                await self._discard(client)
+                client, sent = await self._connect(), 0
+            try:
+                await client.send_message(msg)
+            except SMTPServerDisconnected:
+                # Idle connection was dropped by the server; reconnect once and retry
+                client, sent = await self._connect(), 0
+                await client.send_message(msg)
+            slot = (client, sent + 1)
+        except asyncio.CancelledError:
+            # Cancelled mid-command, so the connection state is unknown; close it without awaiting
+            # and hand back an empty slot so the pool keeps its size
+            if client is not None:
+                client.close()
+            slot = (None, 0)
+            raise
+        except Exception:
+            await self._discard(client)
+            slot = (None, 0)
+            raise
+        finally:
+            queue.put_nowait(slot)
+
+    async def close(self) -> None:
+        """Close all pooled connections"""
+        if self._slots is None:
+            return
+        while not self._slots.empty():
+            client, _ = self._slots.get_nowait()
+            await self._discard(client)
+        self._slots = None
+
+
+smtp_pool = SMTPPool()
+
+_HTML_INVISIBLE_RE = re.compile(r"<(style|script|head)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _same_text(body_html: str, body_text: str) -> bool:
+    """Whether the HTML body, stripped of markup, reads the same as the plain-text body"""
+    visible = html.unescape(_HTML_TAG_RE.sub(" ", _HTML_INVISIBLE_RE.sub(" ", body_html)))
+    return _WHITESPACE_RE.sub(" ", visible).strip() == _WHITESPACE_RE.sub(" ", body_text).strip()
+
+
+async def send_email(
+    to_email: str,
+    subject: str,
+    body_text: str,
+    body_html: Optional[str] = None,
+) -> bool:
+    """Send an email using SMTP settings. Returns True if attempted successfully.
+    If SMTP is not configured, returns False gracefully.
+    When body_html carries the same text as body_text, it is sent as a single text/html part.
+    """
+    smtp_host, email_from = _SMTP[0], _SMTP[1]
+
+    if not smtp_host or not email_from:
+        return False
+
+    msg = EmailMessage()
+    msg["From"] = _FROM_HEADER
+    msg["To"] = to_email
+    msg["Subject"] = subject
+    if body_html and _same_text(body_html, body_text):
+        # A plain-text alternative would repeat the HTML's words, doubling the encoded message for nothing
+        msg.set_content(body_html, subtype="html")
+    else:
+        msg.set_content(body_text)
+        if body_html:
+            msg.add_alternative(body_html, subtype="html")
+
+    try:
+        await smtp_pool.send_message(msg)
+        return True
+    except Exception:
+        return False
+
+
+def create_partnership_invitation_email(inviter_name: str, invitee_email: str, invitation_link: str) -> tuple[str, str]:
+    """Create email content for partnership invitation.
+
+    Returns:
+        tuple: (subject, html_body)
+    """
+    subject = _INVITE_SUBJECT.format_map({"inviter_name": inviter_name})
+    html_body = _INVITE_HTML_TEMPLATE.render(inviter_name=inviter_name, invitation_link=invitation_link)
     return subject, html_body
 
 
-async def send_partnership_invitation(inviter_name: str, invitee_email: str, invitation_link: str) -> bool:
-    """Send a partnership invitation email."""
+def _partnership_invitation_kwargs(inviter_name: str, invitee_email: str, invitation_link: str) -> dict:
     subject, html_body = create_partnership_invitation_email(inviter_name, invitee_email, invitation_link)
+    text_body = _INVITE_TEXT.format_map({"inviter_name": inviter_name, "invitation_link": invitation_link})
+    return {
+        "to_email": invitee_email,
+        "subject": subject,
+        "body_text": text_body,
+        "body_html": html_body,
+    }
 
-    # Create plain text version
-    text_body = f"""
-    {inviter_name} has invited you to join Loom!
 
-    Loom helps couples coordinate their schedules, share events, and stay connected.
+async def send_partnership_invitation(inviter_name: str, invitee_email: str, invitation_link: str) -> bool:
+    """Send a partnership invitation email."""
+    return await send_email(**_partnership_invitation_kwargs(inviter_name, invitee_email, invitation_link))
+
 
-    Accept the invitation here: {invitation_link}
+async def send_partnership_invitations(invitations: List[Tuple[str, str, str]]) -> List[bool]:
+    """Send several (inviter_name, invitee_email, invitation_link) invitations concurrently.
 
-    This invitation will expire in 7 days.
+    Concurrency is bounded by the SMTP pool size, so each pooled connection carries its own share.
     """
+    messages = [_partnership_invitation_kwargs(*invitation) for invitation in invitations]
+    return list(await asyncio.gather(*(send_email(**message) for message in messages)))
+
+
+def queue_partnership_invitation(inviter_name: str, invitee_email: str, invitation_link: str) -> None:
+    """Queue a partnership invitation email for the background workers and return immediately."""
+    queue_email(**_partnership_invitation_kwargs(inviter_name, invitee_email, invitation_link))
+
+
+# Background email delivery so request handlers never wait on SMTP round trips
+_email_queue: Optional[asyncio.Queue] = None
+_email_workers: List[asyncio.Task] = []
+# Sends started while the workers are not running; the loop only holds weak references to tasks
+_detached_sends: Set[asyncio.Task] = set()
+
+
+async def _deliver(message: dict) -> None:
+    try:
+        if not await send_email(**message):
+            logger.warning("Failed to send queued email to %s", message.get("to_email"))
+    except Exception as e:
+        logger.error("Email delivery error: %s", e)
+
+
+async def _email_worker(queue: asyncio.Queue):
+    while True:
+        message = await queue.get()
+        try:
+            if message is None:
+                return
+            await _deliver(message)
+        finally:
+            queue.task_done()
+
+
+def queue_email(**message) -> None:
+    """Hand an email (send_email keyword arguments) to the background workers."""
+    if _email_queue is None:
+        # Workers not running (e.g. scripts/tests); send in a detached task instead
+        task = asyncio.create_task(_deliver(message))
+        _detached_sends.add(task)
+        task.add_done_callback(_detached_sends.discard)
+        return
+    _email_queue.put_nowait(message)
+
+
+def start_email_workers(count: int = 2):
+    global _email_queue
+    if _email_workers:
+        return
+    _email_queue = asyncio.Queue()
+    for _ in range(count):
+        _email_workers.append(asyncio.create_task(_email_worker(_email_queue)))
+
 
-    return await send_email(
-        to_email=invitee_email,
-        subject=subject,
-        body_text=text_body.strip(),
-        body_html=html_body
-    )
\ No newline at end of file
+async def stop_email_workers():
+    """Let queued emails drain, then stop the workers."""
+    global _email_queue
+    if _email_queue is None:
+        return
+    for _ in _email_workers:
+        _email_queue.put_nowait(None)
+    await asyncio.gather(*_email_workers, return_exceptions=True)
+    _email_workers.clear()
+    _email_queue = None
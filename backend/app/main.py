@@ -1,15 +1,22 @@
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI, Response
 import logging
-import os
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from .config import settings
 from .database import connect_to_mongo, close_mongo_connection, get_database
 from .middleware import setup_middleware
 from .cache import cache_manager
+from .email import smtp_pool, start_email_workers, stop_email_workers
 from .routers import auth, events, tasks, proposals, partner, availability, websockets
 from .reminders import start_reminders_loop, stop_reminders_loop
 
+# Resolved once at import; settings.ENV mirrors APP_ENV
+ENV = getattr(settings, "ENV", "dev").lower()
+IS_PROD = ENV in {"prod", "production"}
+
+# localhost on any port in development; Starlette compiles this once and fullmatches it per request
+_DEV_ORIGIN_REGEX = r"https?://localhost(:\d+)?"
+
 
 def _validate_security_settings():
     """Validate critical security settings based on environment.
@@ -21,9 +28,7 @@ def _validate_security_settings():
     logger = logging.getLogger(__name__)
 
     # Fail fast on bad secrets in production
-    import os
-    app_env = os.getenv('APP_ENV', 'development')
-    if app_env == 'production':
+    if IS_PROD:
         default_secret_substr = "your-super-secure-secret-key-change-this"
         if default_secret_substr in getattr(settings, "SECRET_KEY", ""):
             raise RuntimeError(
@@ -48,7 +53,11 @@ async def lifespan(app: FastAPI):
     # Startup
     _validate_security_settings()
     await connect_to_mongo()
+    # Handlers read the handle straight off app.database, so fail here rather than per request
+    if get_database() is None:
+        raise RuntimeError("MongoDB database handle was not initialised")
     await cache_manager.initialize()
+    start_email_workers()
     # Start reminders background loop after DB is available
     try:
         start_reminders_loop(get_database())
@@ -60,6 +69,8 @@ async def lifespan(app: FastAPI):
         stop_reminders_loop()
     except Exception:
         pass
+    await stop_email_workers()
+    await smtp_pool.close()
     await close_mongo_connection()
 
 
@@ -71,18 +82,17 @@ app = FastAPI(
 
 # CORS middleware
 logger = logging.getLogger(__name__)
-app_env = os.getenv('APP_ENV', 'development')
-if app_env in {"dev", "development"}:
+if ENV in {"dev", "development"}:
     # In development, allow localhost variants on any port
     cors_kwargs = dict(
-        allow_origin_regex=r"https?://localhost(:\d+)?",
+        allow_origin_regex=_DEV_ORIGIN_REGEX,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
     )
     logger.info(
         "ENV=%s - CORS enabled for development with regex: %s",
-        getattr(settings, "ENV", "dev"),
+        ENV,
         cors_kwargs["allow_origin_regex"],
     )
 else:
@@ -95,7 +105,7 @@ else:
     )
     logger.info(
         "ENV=%s - CORS enabled with explicit origins: %s",
-        getattr(settings, "ENV", "dev"),
+        ENV,
         settings.CORS_ORIGINS,
     )
 app.add_middleware(CORSMiddleware, **cors_kwargs)
@@ -103,21 +113,23 @@ app.add_middleware(CORSMiddleware, **cors_kwargs)
 # Security middleware (rate limiting and logging)
 setup_middleware(app)
 
-# Include routers
-app.include_router(auth.router, prefix=settings.API_V1_STR)
-app.include_router(events.router, prefix=settings.API_V1_STR)
-app.include_router(tasks.router, prefix=settings.API_V1_STR)
-app.include_router(proposals.router, prefix=settings.API_V1_STR)
-app.include_router(partner.router, prefix=settings.API_V1_STR)
-app.include_router(availability.router, prefix=settings.API_V1_STR)
-app.include_router(websockets.router, prefix=settings.API_V1_STR)
+# Include routers: collect them on one API router, then mount it once under the API prefix
+api_router = APIRouter()
+for module in (auth, events, tasks, proposals, partner, availability, websockets):
+    api_router.include_router(module.router)
+app.include_router(api_router, prefix=settings.API_V1_STR)
+
+
+# Health probes are hit constantly; serve prebuilt bytes instead of serializing a dict each time
+_HEALTH_BYTES = b'{"ok":true}'
+_API_HEALTH_BYTES = b'{"ok":true,"api_version":"v1"}'
 
 
 @app.get("/health")
 async def health():
-    return {"ok": True}
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 
 @app.get(f"{settings.API_V1_STR}/health")
 async def api_health():
-    return {"ok": True, "api_version": "v1"}
+    return Response(content=_API_HEALTH_BYTES, media_type="application/json")
@@ -1,5 +1,8 @@
+import atexit
 import logging
+import queue
 import time
+from logging.handlers import QueueHandler, QueueListener
 from typing import Callable
 from fastapi import Request, Response
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -8,56 +11,90 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from .config import settings
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging: request handlers only enqueue records; a listener thread does the file/stream I/O
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler('app.log'),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+_queue_handler = QueueHandler(_log_queue)
+# Records are fully formatted by the listener's handlers, so only the message is rendered here
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 
 logger = logging.getLogger(__name__)
 
 # Rate limiter configuration
-limiter = Limiter(key_func=get_remote_address)
+
+
+def _rate_limit_storage_uri() -> str:
+    """Shared Redis counters outside development so limits hold across workers (mirrors the cache setup)."""
+    if settings.ENV in {"dev", "development"}:
+        return "memory://"
+    redis_url = settings.CACHE_REDIS_URL
+    if not redis_url.startswith(("redis://", "rediss://")):
+        redis_url = f"redis://{redis_url}"
+    return redis_url
+
+
+# sliding-window-counter keeps two counters per key (atomic Lua on Redis) instead of a timestamp per hit;
+# if Redis is unreachable the limiter falls back to in-process counters
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=_rate_limit_storage_uri(),
+    strategy="sliding-window-counter",
+    in_memory_fallback_enabled=True,
+)
 
 
 async def logging_middleware(request: Request, call_next: Callable) -> Response:
     """
     Middleware for logging requests and responses.
     """
-    start_time = time.time()
+    log_enabled = logger.isEnabledFor(logging.INFO)
+    if not log_enabled and not settings.DEBUG:
+        # Nothing would be logged and no timing header is wanted; skip timing entirely
+        return await call_next(request)
+
+    start_time = time.perf_counter()
 
     # Log incoming request
-    client_host = request.client.host if request.client else "unknown"
-    logger.info(f"Request: {request.method} {request.url} from {client_host}")
+    if log_enabled:
+        client_host = request.client.host if request.client else "unknown"
+        logger.info("Request: %s %s from %s", request.method, request.url, client_host)
 
     try:
         # Process the request
         response = await call_next(request)
 
         # Calculate processing time
-        process_time = time.time() - start_time
+        process_time = time.perf_counter() - start_time
 
         # Log response
         logger.info(
-            f"Response: {response.status_code} for {request.method} {request.url} "
-            f"in {process_time:.4f}s"
+            "Response: %s for %s %s in %.4fs",
+            response.status_code, request.method, request.url, process_time,
         )
 
-        # Add processing time to response headers
-        response.headers["X-Process-Time"] = str(process_time)
+        # Processing time header only in debug mode
+        if settings.DEBUG:
+            response.headers["X-Process-Time"] = f"{process_time:.4f}"
 
         return response
 
     except Exception as e:
         # Log errors
-        process_time = time.time() - start_time
+        process_time = time.perf_counter() - start_time
         logger.error(
-            f"Error: {str(e)} for {request.method} {request.url} "
-            f"in {process_time:.4f}s"
+            "Error: %s for %s %s in %.4fs",
+            e, request.method, request.url, process_time,
         )
         raise
 
@@ -1,40 +1,65 @@
+import functools
 from datetime import datetime, timezone
 from typing import List, Optional, Literal
 from pydantic import BaseModel, Field, ConfigDict
 from pydantic.functional_serializers import field_serializer
 from pydantic.functional_validators import field_validator
 from bson import ObjectId
+from bson.errors import InvalidId
 from pydantic_core import core_schema
 
 
+_UTC = timezone.utc
+# Timezone-aware "now" for default factories (a partial over the C datetime.now, no lambda frame)
+_utc_now = functools.partial(datetime.now, _UTC)
+
+
+def _utc_z(value: datetime) -> str:
+    """ISO-8601 with an explicit 'Z'; naive datetimes are UTC in storage"""
+    # Defaults are tz-aware, but documents read back from Mongo are naive
+    if value.tzinfo is None:
+        return value.isoformat() + "Z"
+    if value.tzinfo is not _UTC:
+        value = value.astimezone(_UTC)
+    # isoformat() of a UTC-aware datetime always ends with '+00:00'
+    return value.isoformat()[:-6] + "Z"
+
+
 class PyObjectId(ObjectId):
     @classmethod
     def __get_pydantic_core_schema__(cls, source_type, handler):
-        return core_schema.union_schema([
-            core_schema.is_instance_schema(ObjectId),
-            core_schema.no_info_plain_validator_function(cls.validate)
-        ], serialization=core_schema.to_string_ser_schema())
+        # A single plain validator: ObjectId instances pass straight through, anything else goes
+        # through the ObjectId constructor, which does the hex/bytes validation itself
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            # Stringified in JSON mode only; python-mode dumps keep ObjectId so stored ids keep their BSON type
+            serialization=core_schema.to_string_ser_schema(),
+            json_schema_input_schema=core_schema.str_schema(),
+        )
 
     @classmethod
     def validate(cls, v):
         if isinstance(v, ObjectId):
             return v
-        if isinstance(v, str) and ObjectId.is_valid(v):
+        if v is None:
+            # ObjectId(None) would silently generate a fresh id
+            raise ValueError("Invalid ObjectId")
+        try:
             return ObjectId(v)
-        raise ValueError("Invalid ObjectId")
+        except (InvalidId, TypeError):
+            raise ValueError("Invalid ObjectId")
+
+
+_MONGO_MODEL_CONFIG = ConfigDict(
+    populate_by_name=True,
+    arbitrary_types_allowed=True
+)
 
 
 class MongoBaseModel(BaseModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
 
-    model_config = ConfigDict(
-        populate_by_name=True,
-        arbitrary_types_allowed=True
-    )
-
-    @field_serializer('id')
-    def serialize_id(self, value):
-        return str(value)
+    model_config = _MONGO_MODEL_CONFIG
 
 
 
@@ -69,11 +94,12 @@ class UserUpdate(BaseModel):
     ui_partner_color: Optional[str] = None
     timezone: Optional[str] = None
     language: Optional[Literal["en", "zh"]] = None
+    is_onboarded: Optional[bool] = None
 
 
 class User(MongoBaseModel, UserBase):
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utc_now)
+    updated_at: datetime = Field(default_factory=_utc_now)
 
 
 # Partner Models
@@ -95,13 +121,9 @@ class PartnershipBase(BaseModel):
     invited_email: str  # Email of the invited user
     status: Literal["pending", "accepted", "declined"] = "pending"
     invited_by: PyObjectId  # User ID who sent the invitation
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utc_now)
     accepted_at: Optional[datetime] = None
 
-    @field_serializer('user1_id', 'user2_id', 'invited_by')
-    def serialize_object_ids(self, value):
-        return str(value) if value else None
-
 
 class Partnership(MongoBaseModel, PartnershipBase):
     pass
@@ -118,11 +140,7 @@ class InviteTokenBase(BaseModel):
     expires_at: datetime
     used: bool = False
     used_by: Optional[PyObjectId] = None  # User ID who used the invite
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-
-    @field_serializer('created_by', 'used_by')
-    def serialize_object_ids(self, value):
-        return str(value) if value else None
+    created_at: datetime = Field(default_factory=_utc_now)
 
 
 class InviteToken(MongoBaseModel, InviteTokenBase):
@@ -131,6 +149,7 @@ class InviteToken(MongoBaseModel, InviteTokenBase):
 
 class InviteTokenCreate(BaseModel):
     expires_in_days: int = 7  # Default 7 days
+    invitee_email: Optional[str] = None  # When set, the invite link is also emailed to this address
 
 
 # Event Models
@@ -141,10 +160,7 @@ class TimeSlot(BaseModel):
     # Ensure datetimes are serialized with explicit UTC 'Z' to avoid ambiguity
     @field_serializer('start_time', 'end_time')
     def serialize_times(self, value: datetime):
-        if value.tzinfo is None:
-            # Assume naive datetimes are UTC in storage
-            value = value.replace(tzinfo=timezone.utc)
-        return value.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
+        return _utc_z(value)
 
 
 class EventBase(BaseModel):
@@ -158,11 +174,6 @@ class EventBase(BaseModel):
     reminders: List[int] = []  # Minutes before event
     timezone: str = "UTC"
 
-    @field_serializer('attendees')
-    def serialize_attendees(self, value):
-        return [str(attendee) for attendee in value]
-
-
 
 class EventCreate(EventBase):
     pass
@@ -179,35 +190,28 @@ class EventUpdate(BaseModel):
     reminders: Optional[List[int]] = None
     timezone: Optional[str] = None
 
-    @field_serializer('attendees')
-    def serialize_attendees(self, value):
-        return [str(attendee) for attendee in value] if value else None
-
 
-class Event(MongoBaseModel, EventBase):
+# Hot read models (Event, Proposal, Task, EventMessage, ChecklistItem) declare their fields inline
+# rather than combining MongoBaseModel with a *Base class; field order matches the old MRO order.
+class Event(BaseModel):
+    title: str
+    description: Optional[str] = None
+    start_time: datetime
+    end_time: datetime
+    location: Optional[str] = None
+    visibility: Literal["shared", "private", "title_only"] = "shared"
+    attendees: List[PyObjectId] = []  # User IDs
+    reminders: List[int] = []  # Minutes before event
+    timezone: str = "UTC"
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     created_by: PyObjectId  # User ID
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
-
-    @field_serializer('created_by')
-    def serialize_created_by(self, value):
-        return str(value)
+    created_at: datetime = Field(default_factory=_utc_now)
+    updated_at: datetime = Field(default_factory=_utc_now)
 
-    # Serialize created/updated with explicit UTC 'Z'
-    @field_serializer('created_at', 'updated_at')
-    def serialize_audit_times(self, value: datetime):
-        if value.tzinfo is None:
-            value = value.replace(tzinfo=timezone.utc)
-        return value.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
+    model_config = _MONGO_MODEL_CONFIG
 
-    # Serialize start/end with explicit UTC 'Z'
-    @field_serializer('start_time', 'end_time')
-    def serialize_event_times(self, value: datetime):
-        if value.tzinfo is None:
-            value = value.replace(tzinfo=timezone.utc)
-        return value.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
-
-    # Parse datetime strings from MongoDB back to datetime objects
+    # Parse datetime strings from MongoDB back to datetime objects and normalize everything to aware UTC,
+    # so pydantic-core emits the explicit 'Z' itself when dumping to JSON (no per-field serializer callbacks)
     @field_validator('start_time', 'end_time', 'created_at', 'updated_at', mode='before')
     @classmethod
     def parse_datetime_strings(cls, value):
@@ -217,10 +221,16 @@ class Event(MongoBaseModel, EventBase):
                 value = value[:-1] + '+00:00'
             # Parse the datetime string
             try:
-                return datetime.fromisoformat(value.replace('Z', '+00:00'))
+                value = datetime.fromisoformat(value.replace('Z', '+00:00'))
             except ValueError:
                 # Fallback: try parsing without timezone info
-                return datetime.fromisoformat(value)
+                value = datetime.fromisoformat(value)
+        if isinstance(value, datetime):
+            if value.tzinfo is None:
+                # Naive datetimes are UTC in storage
+                return value.replace(tzinfo=_UTC)
+            if value.tzinfo is not _UTC:
+                return value.astimezone(_UTC)
         return value
 
 
@@ -233,25 +243,26 @@ class ProposalBase(BaseModel):
     message: Optional[str] = None
     proposed_to: PyObjectId  # User ID
 
-    @field_serializer('proposed_to')
-    def serialize_proposed_to(self, value):
-        return str(value)
-
 
 class ProposalCreate(ProposalBase):
     pass
 
 
-class Proposal(MongoBaseModel, ProposalBase):
+class Proposal(BaseModel):
+    title: str
+    description: Optional[str] = None
+    proposed_times: List[TimeSlot]
+    location: Optional[str] = None
+    message: Optional[str] = None
+    proposed_to: PyObjectId  # User ID
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     proposed_by: PyObjectId  # User ID
     status: Literal["pending", "accepted", "declined"] = "pending"
     accepted_time_slot: Optional[TimeSlot] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utc_now)
+    updated_at: datetime = Field(default_factory=_utc_now)
 
-    @field_serializer('proposed_by')
-    def serialize_proposed_by(self, value):
-        return str(value)
+    model_config = _MONGO_MODEL_CONFIG
 
 
 # Task Models
@@ -272,54 +283,36 @@ class TaskUpdate(BaseModel):
     completed: Optional[bool] = None
 
 
-class Task(MongoBaseModel, TaskBase):
+class Task(BaseModel):
+    title: str
+    description: Optional[str] = None
+    due_date: Optional[datetime] = None
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     completed: bool = False
     created_by: PyObjectId  # User ID
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utc_now)
+    updated_at: datetime = Field(default_factory=_utc_now)
 
-    @field_serializer('created_by')
-    def serialize_created_by(self, value):
-        return str(value)
+    model_config = _MONGO_MODEL_CONFIG
 
 
 # Event Chat Models
-class EventMessageBase(BaseModel):
-    event_id: PyObjectId
-    sender_id: PyObjectId
-    message: str
-
-    @field_serializer('event_id', 'sender_id')
-    def serialize_object_ids(self, value):
-        return str(value)
-
-
 class EventMessageCreate(BaseModel):
     message: str
 
 
-class EventMessage(MongoBaseModel, EventMessageBase):
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
-
-
-# Event Checklist Models
-class ChecklistItemBase(BaseModel):
+class EventMessage(BaseModel):
     event_id: PyObjectId
-    title: str
-    description: Optional[str] = None
-    completed: bool = False
-    assigned_to: Optional[PyObjectId] = None  # User ID assigned to this item
+    sender_id: PyObjectId
+    message: str
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    created_at: datetime = Field(default_factory=_utc_now)
+    updated_at: datetime = Field(default_factory=_utc_now)
 
-    @field_serializer('event_id')
-    def serialize_event_id(self, value):
-        return str(value)
-    
-    @field_serializer('assigned_to')
-    def serialize_assigned_to(self, value):
-        return str(value) if value else None
+    model_config = _MONGO_MODEL_CONFIG
 
 
+# Event Checklist Models
 class ChecklistItemCreate(BaseModel):
     title: str
     description: Optional[str] = None
@@ -333,16 +326,20 @@ class ChecklistItemUpdate(BaseModel):
     assigned_to: Optional[PyObjectId] = None
 
 
-class ChecklistItem(MongoBaseModel, ChecklistItemBase):
+class ChecklistItem(BaseModel):
+    event_id: PyObjectId
+    title: str
+    description: Optional[str] = None
+    completed: bool = False
+    assigned_to: Optional[PyObjectId] = None  # User ID assigned to this item
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     completed_by: Optional[PyObjectId] = None  # User ID who completed it
     completed_at: Optional[datetime] = None
     created_by: PyObjectId  # User ID who created it
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utc_now)
+    updated_at: datetime = Field(default_factory=_utc_now)
 
-    @field_serializer('completed_by', 'created_by')
-    def serialize_object_ids(self, value):
-        return str(value) if value else None
+    model_config = _MONGO_MODEL_CONFIG
 
 
 # Availability Models
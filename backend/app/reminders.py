@@ -1,50 +1,26 @@
 import asyncio
+import logging
+import time
 from datetime import datetime, timezone, timedelta
 from typing import Optional, List
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
 # Background task reference
 _reminders_task: Optional[asyncio.Task] = None
 
 
-async def _should_send_reminder(now: datetime, event_start: datetime, reminders: List[int], window_seconds: int = 60) -> Optional[int]:
-    """
-    Determine if a reminder should be sent now for any of the configured reminder minutes.
-    Returns the matching minutes value if a reminder should be sent, otherwise None.
+def _build_reminder_notification(user_id: str, event_doc: dict, minutes: int) -> dict:
     """
-    # Ensure timezone-aware UTC datetimes
-    if event_start.tzinfo is None:
-        event_start = event_start.replace(tzinfo=timezone.utc)
-    if now.tzinfo is None:
-        now = now.replace(tzinfo=timezone.utc)
-
-    delta_seconds = (event_start - now).total_seconds()
-
-    for m in reminders or []:
-        target_seconds = m * 60
-        if 0 <= (delta_seconds - target_seconds) < window_seconds:
-            return m
-    return None
-
-
-async def _send_reminder_for_event(db, user_id: str, event_doc: dict, minutes: int):
-    """
-    Send a reminder to a single user for the given event if not already sent (deduped by dedupe_key).
+    Build the notification_events document for one user's reminder (deduped by dedupe_key on insert).
     """
     event_id = str(event_doc.get("_id"))
     dedupe_key = f"reminders:event:{event_id}:{minutes}"
 
-    # Check if we already logged this reminder for this user
-    existing = await db.notification_events.find_one({
-        "user_id": ObjectId(user_id),
-        "dedupe_key": dedupe_key,
-        "type": "reminders",
-    })
-    if existing:
-        return
-
     # Compose payload
     title = "Event Reminder"
     start_time = event_doc.get("start_time")
@@ -77,16 +53,60 @@ async def _send_reminder_for_event(db, user_id: str, event_doc: dict, minutes: i
     }
 
     # Log notification event (minimal)
-    await db.notification_events.insert_one({
+    return {
         "user_id": ObjectId(user_id),
         "type": "reminders",
         "subtype": f"{minutes}m",
         "entity_ref": {"event_id": event_id},
         "payload_summary": payload.get("body"),
         "dedupe_key": dedupe_key,
-        "created_at": datetime.utcnow(),
+        "created_at": datetime.now(timezone.utc),
         "delivery_status": [],
-    })
+    }
+
+
+def _due_reminders_pipeline(now: datetime, lookahead: timedelta, window_seconds: int) -> list:
+    """Aggregation yielding one document per (event, reminder minutes, attendee) that is due and unsent."""
+    window_ms = window_seconds * 1000
+    return [
+        {"$match": {
+            "start_time": {"$gte": now, "$lte": now + lookahead},
+            "reminders": {"$exists": True, "$ne": []},
+        }},
+        {"$project": {"title": 1, "start_time": 1, "reminders": 1, "attendees": 1}},
+        {"$unwind": "$reminders"},
+        {"$addFields": {
+            "_offset_ms": {"$subtract": [
+                {"$subtract": ["$start_time", now]},
+                {"$multiply": ["$reminders", 60000]},
+            ]},
+        }},
+        {"$match": {"$expr": {"$and": [
+            {"$gte": ["$_offset_ms", 0]},
+            {"$lt": ["$_offset_ms", window_ms]},
+        ]}}},
+        {"$unwind": "$attendees"},
+        {"$lookup": {
+            "from": "notification_events",
+            "let": {
+                "uid": {"$convert": {"input": "$attendees", "to": "objectId", "onError": None, "onNull": None}},
+                "key": {"$concat": [
+                    "reminders:event:", {"$toString": "$_id"}, ":", {"$toString": "$reminders"},
+                ]},
+            },
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$user_id", "$$uid"]},
+                    {"$eq": ["$dedupe_key", "$$key"]},
+                ]}}},
+                {"$limit": 1},
+                {"$project": {"_id": 1}},
+            ],
+            "as": "_sent",
+        }},
+        {"$match": {"_sent": {"$size": 0}}},
+        {"$project": {"_sent": 0, "_offset_ms": 0}},
+    ]
 
 
 async def reminders_loop(db):
@@ -102,42 +122,45 @@ async def reminders_loop(db):
     window_seconds = 60  # consider reminders due within this window
 
     while True:
+        tick_started = time.monotonic()
         try:
-            now = datetime.utcnow().replace(tzinfo=timezone.utc)
-
-            # Find events starting within lookahead that have reminders configured
-            cursor = db.events.find({
-                "start_time": {"$gte": now, "$lte": now + lookahead},
-                "reminders": {"$exists": True, "$ne": []},
-            })
-            events = [doc async for doc in cursor]
-
-            for event in events:
-                reminders = event.get("reminders", [])
-                start_time = event.get("start_time")
-                # Normalize event_start to datetime
-                try:
-                    if isinstance(start_time, datetime):
-                        event_start = start_time
-                    elif isinstance(start_time, str):
-                        event_start = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                    else:
-                        continue
-                except Exception:
-                    continue
-                minutes = await _should_send_reminder(now, event_start, reminders, window_seconds)
-                if minutes is None:
-                    continue
-
-                attendees = [str(a) for a in (event.get("attendees") or [])]
-                for uid in attendees:
-                    await _send_reminder_for_event(db, uid, event, minutes)
+            await _send_due_reminders(db, datetime.now(timezone.utc), lookahead, window_seconds)
         except Exception as e:
             # Log and continue
-            import logging
-            logging.getLogger(__name__).error(f"Reminders loop error: {e}")
-        finally:
-            await asyncio.sleep(poll_interval)
+            logger.error("Reminders loop error: %s", e)
+        # Anchor ticks to the poll interval so slow ticks do not push later ones past the reminder window
+        await asyncio.sleep(max(0.0, poll_interval - (time.monotonic() - tick_started)))
+
+
+async def _send_due_reminders(db, now: datetime, lookahead: timedelta, window_seconds: int) -> None:
+    """One reminders tick: log a notification for every reminder due now that has not been sent."""
+    # Let the database expand (event, reminder, attendee) and keep only reminders due now
+    # that have not been logged yet
+    cursor = db.events.aggregate(_due_reminders_pipeline(now, lookahead, window_seconds))
+    due_reminders = [doc async for doc in cursor]
+
+    pending = []
+    seen = set()  # (user_id, dedupe_key) already queued this tick, e.g. duplicate attendees
+    for due in due_reminders:
+        try:
+            doc = _build_reminder_notification(str(due["attendees"]), due, due["reminders"])
+        except Exception as e:
+            logger.error("Reminder skipped for event %s user %s: %s", due.get("_id"), due.get("attendees"), e)
+            continue
+        key = (doc["user_id"], doc["dedupe_key"])
+        if key not in seen:
+            seen.add(key)
+            pending.append(doc)
+
+    if pending:
+        # One unordered bulk insert per tick; the unique (user_id, dedupe_key) index rejects
+        # anything already sent without stopping the rest of the batch
+        try:
+            await db.notification_events.insert_many(pending, ordered=False)
+        except BulkWriteError as e:
+            unexpected = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+            if unexpected or e.details.get("writeConcernErrors"):
+                logger.error("Reminder insert errors: %s", unexpected or e.details.get("writeConcernErrors"))
 
 
 def start_reminders_loop(db):
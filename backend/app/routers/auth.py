@@ -1,33 +1,27 @@
 from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from ..models import User, UserCreate, UserLogin, Token, ApiResponse, ChangePasswordRequest, DeleteAccountRequest
-from ..auth import authenticate_user, create_access_token, create_refresh_token, verify_refresh_token, get_password_hash, get_current_user, verify_password
-from ..database import get_database
+from ..models import User, UserCreate, UserUpdate, UserLogin, Token, ApiResponse, ChangePasswordRequest, DeleteAccountRequest
+from ..auth import authenticate_user, create_access_token, create_refresh_token, verify_refresh_token, get_password_hash_async, get_current_user, verify_password_async, invalidate_user
+from .. import database as mongo
 from ..config import settings
 from ..security import validate_password_strength, validate_email_format
+from ..middleware import limiter
 from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import re
 
-# Rate limiter for auth endpoints
-limiter = Limiter(key_func=get_remote_address)
-
 router = APIRouter(prefix="/auth", tags=["authentication"])
 security = HTTPBearer()
 
+_HEX_COLOR_RE = re.compile(r"^#([0-9a-fA-F]{6})$")
+
 
-@router.post("/register", response_model=ApiResponse)
+@router.post("/register", response_model=ApiResponse, response_model_by_alias=False)
 @limiter.limit("5/minute")
 async def register(request: Request, user_data: UserCreate):
     """Register a new user"""
-    db = get_database()
-    if db is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database connection not available"
-        )
+    db = mongo.database
     
     # Validate email format
     if not validate_email_format(user_data.email):
@@ -36,14 +30,6 @@ async def register(request: Request, user_data: UserCreate):
             detail="Invalid email format"
         )
 
-    # Check if user already exists
-    existing_user = await db.users.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-
     # Validate password strength
     password_valid, password_error = validate_password_strength(user_data.password)
     if not password_valid:
@@ -54,25 +40,23 @@ async def register(request: Request, user_data: UserCreate):
 
     # Create new user
     user_dict = user_data.model_dump(exclude={"password"})
-    user_dict["password_hash"] = get_password_hash(user_data.password)
+    user_dict["password_hash"] = await get_password_hash_async(user_data.password)
     user_dict["is_onboarded"] = False
     
-    # Insert user into database
-    result = await db.users.insert_one(user_dict)
-    
-    # Get the created user
-    created_user = await db.users.find_one({"_id": result.inserted_id})
-    if not created_user:
+    # Insert user into database; the unique email index rejects existing accounts
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to create user"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
         )
     
-    # Remove password hash from response
-    created_user.pop("password_hash", None)
-    user = User(**created_user)
+    # insert_one added the generated _id to user_dict; build the response from it
+    user_dict.pop("password_hash", None)
+    user = User(**user_dict)
     
-    return ApiResponse(data=user.model_dump(), message="User registered successfully")
+    return ApiResponse(data=user, message="User registered successfully")
 
 
 @router.post("/login", response_model=Token)
@@ -87,11 +71,12 @@ async def login(request: Request, user_credentials: UserLogin):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    user_id = str(user.id)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
+        data={"sub": user_id}, expires_delta=access_token_expires
     )
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    refresh_token = create_refresh_token(data={"sub": user_id})
 
     return Token(access_token=access_token, refresh_token=refresh_token, token_type="bearer")
 
@@ -125,49 +110,29 @@ async def refresh_token(request: Request, refresh_token_request: dict):
     return Token(access_token=access_token, refresh_token=new_refresh_token, token_type="bearer")
 
 
-@router.get("/me", response_model=ApiResponse)
+@router.get("/me", response_model=ApiResponse, response_model_by_alias=False)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information"""
-    return ApiResponse(data=current_user.model_dump(), message="User info retrieved successfully")
+    return ApiResponse(data=current_user, message="User info retrieved successfully")
 
 
-@router.put("/me", response_model=ApiResponse)
+@router.put("/me", response_model=ApiResponse, response_model_by_alias=False)
 async def update_current_user(
-    user_update: dict,
+    user_update: UserUpdate,
     current_user: User = Depends(get_current_user)
 ):
     """Update current user information"""
-    db = get_database()
-    if db is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database connection not available"
-        )
+    db = mongo.database
 
-    # Update user
-    update_data = {}
-    if "display_name" in user_update:
-        update_data["display_name"] = user_update["display_name"]
-    if "color_preference" in user_update:
-        update_data["color_preference"] = user_update["color_preference"]
+    # Only fields the client actually sent; nulls would clobber required profile fields
+    update_data = user_update.model_dump(exclude_unset=True, exclude_none=True)
     # Viewer-centric colors: 'user' | 'partner' or hex color like '#14b8a6'
-    hex_re = re.compile(r"^#([0-9a-fA-F]{6})$")
-    if "ui_self_color" in user_update:
-        v = str(user_update["ui_self_color"]).strip()
-        if v not in ("user", "partner") and not hex_re.match(v):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ui_self_color")
-        update_data["ui_self_color"] = v
-    if "ui_partner_color" in user_update:
-        v = str(user_update["ui_partner_color"]).strip()
-        if v not in ("user", "partner") and not hex_re.match(v):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ui_partner_color")
-        update_data["ui_partner_color"] = v
-    if "timezone" in user_update:
-        update_data["timezone"] = user_update["timezone"]
-    if "language" in user_update:
-        update_data["language"] = user_update["language"]
-    if "is_onboarded" in user_update:
-        update_data["is_onboarded"] = user_update["is_onboarded"]
+    for field in ("ui_self_color", "ui_partner_color"):
+        if field in update_data:
+            v = update_data[field].strip()
+            if v not in ("user", "partner") and not _HEX_COLOR_RE.match(v):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid {field}")
+            update_data[field] = v
 
     if update_data:
         update_data["updated_at"] = datetime.now(timezone.utc)
@@ -176,6 +141,7 @@ async def update_current_user(
             {"$set": update_data},
             return_document=ReturnDocument.AFTER
         )
+        invalidate_user(str(current_user.id))
     else:
         updated_user = await db.users.find_one({"_id": current_user.id})
 
@@ -188,7 +154,7 @@ async def update_current_user(
     updated_user.pop("password_hash", None)
     user = User(**updated_user)
 
-    return ApiResponse(data=user.model_dump(), message="User updated successfully")
+    return ApiResponse(data=user, message="User updated successfully")
 
 
 @router.post("/change-password", response_model=ApiResponse)
@@ -199,12 +165,7 @@ async def change_password(
     """Change the current user's password.
     Validates current password, checks new password strength, updates password hash.
     """
-    db = get_database()
-    if db is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database connection not available"
-        )
+    db = mongo.database
 
     # Load full user document including password_hash
     user_doc = await db.users.find_one({"_id": current_user.id})
@@ -212,7 +173,7 @@ async def change_password(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
     # Verify current password
-    if not verify_password(payload.current_password, user_doc.get("password_hash", "")):
+    if not await verify_password_async(payload.current_password, user_doc.get("password_hash", "")):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Current password is incorrect")
 
     # Validate new password strength
@@ -221,7 +182,7 @@ async def change_password(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=err or "Weak password")
 
     # Update password hash and updated_at
-    new_hash = get_password_hash(payload.new_password)
+    new_hash = await get_password_hash_async(payload.new_password)
     updated = await db.users.find_one_and_update(
         {"_id": current_user.id},
         {"$set": {"password_hash": new_hash, "updated_at": datetime.now(timezone.utc)}},
@@ -241,18 +202,13 @@ async def delete_account(
     """Delete current user's account and cascade delete associated data.
     Requires current password confirmation.
     """
-    db = get_database()
-    if db is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database connection not available"
-        )
+    db = mongo.database
 
     # Verify password
     user_doc = await db.users.find_one({"_id": current_user.id})
     if not user_doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    if not verify_password(payload.current_password, user_doc.get("password_hash", "")):
+    if not await verify_password_async(payload.current_password, user_doc.get("password_hash", "")):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Current password is incorrect")
 
     user_id_str = str(current_user.id)
@@ -307,9 +263,14 @@ async def delete_account(
     # Events created by user
     await db.events.delete_many({"created_by": user_id_str})
     # Remove user from attendees of remaining events
-    await db.events.update_many({"attendees": {"$in": [user_id_str]}}, {"$pull": {"attendees": user_id_str}})
+    # Bump updated_at so other viewers' cached event lists (ETag) are invalidated
+    await db.events.update_many(
+        {"attendees": user_id_str},
+        {"$pull": {"attendees": user_id_str}, "$set": {"updated_at": datetime.now(timezone.utc)}}
+    )
 
     # Finally, delete the user
     await db.users.delete_one({"_id": current_user.id})
+    invalidate_user(user_id_str)
 
     return ApiResponse(message="Account deleted successfully")
\ No newline at end of file
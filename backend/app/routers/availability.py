@@ -25,12 +25,6 @@ async def find_overlap(
     db = Depends(get_database)
 ):
     """Find available time slots that work for both user and partner"""
-    if db is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database connection not available"
-        )
-
     user_id = str(current_user.id)
 
     partnership = await db.partnerships.find_one({
@@ -38,7 +32,7 @@ async def find_overlap(
             {"user1_id": user_id, "status": "accepted"},
             {"user2_id": user_id, "status": "accepted"},
         ]
-    })
+    }, {"_id": 0, "user1_id": 1, "user2_id": 1})
     if not partnership:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -51,40 +45,35 @@ async def find_overlap(
     start_date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
     end_date = start_date + timedelta(days=request.date_range_days)
     
-    # Get all events for the current user in the date range
-    user_events = []
-    async for event in db.events.find({
-        "$or": [
-            {"created_by": user_id},
-            {"attendees": {"$in": [user_id]}}
-        ],
-        "start_time": {"$lt": end_date},
-        "end_time": {"$gt": start_date}
-    }):
-        user_events.append({
-            "start_time": _to_utc_aware(event["start_time"]),
-            "end_time": _to_utc_aware(event["end_time"])
-        })
-    
-    # Get partner events
-    partner_events = []
-    async for event in db.events.find({
-        "$or": [
-            {"created_by": partner_id},
-            {"attendees": {"$in": [partner_id]}}
-        ],
-        "start_time": {"$lt": end_date},
-        "end_time": {"$gt": start_date}
-    }):
-        partner_events.append({
-            "start_time": _to_utc_aware(event["start_time"]),
-            "end_time": _to_utc_aware(event["end_time"])
-        })
-    
-    # Combine all busy times
-    all_busy_times = user_events + partner_events
+    # Busy times for both partners in one round trip; only the interval fields are shipped back
+    participants = [user_id, partner_id]
+    all_busy_times = await db.events.find(
+        {
+            "$or": [
+                {"created_by": {"$in": participants}},
+                {"attendees": {"$in": participants}}
+            ],
+            "start_time": {"$lt": end_date},
+            "end_time": {"$gt": start_date}
+        },
+        {"_id": 0, "start_time": 1, "end_time": 1}
+    ).to_list(length=None)
+    # The projected docs already have the busy-time shape; normalize them in place
+    for event in all_busy_times:
+        event["start_time"] = _to_utc_aware(event["start_time"])
+        event["end_time"] = _to_utc_aware(event["end_time"])
     all_busy_times.sort(key=lambda x: x["start_time"])
-    
+
+    # Bucket busy times by day offset in one pass. Events spanning midnight land in
+    # every day they touch; buckets stay sorted because all_busy_times is.
+    day_buckets = [[] for _ in range(request.date_range_days)]
+    last_offset = request.date_range_days - 1
+    for event in all_busy_times:
+        first_day = max((event["start_time"] - start_date).days, 0)
+        last_day = min((event["end_time"] - start_date).days, last_offset)
+        for day_offset in range(first_day, last_day + 1):
+            day_buckets[day_offset].append(event)
+
     # Find available slots
     available_slots = []
     duration_delta = timedelta(minutes=request.duration_minutes)
@@ -100,23 +89,16 @@ async def find_overlap(
         day_start = current_day.replace(hour=9)  # 9 AM
         day_end = current_day.replace(hour=18)   # 6 PM
         
-        # Get busy times for this day
-        day_busy_times = [
-            event for event in all_busy_times
-            if event["start_time"] < day_end and event["end_time"] > day_start
-        ]
-        day_busy_times.sort(key=lambda x: x["start_time"])
-        
         # Find gaps between busy times
         current_time = day_start
         
-        for busy_event in day_busy_times:
+        for busy_event in day_buckets[day_offset]:
             busy_start = busy_event["start_time"]
             busy_end = busy_event["end_time"]
 
-            # Already normalized when building busy times, but keep defensive.
-            busy_start = _to_utc_aware(busy_start)
-            busy_end = _to_utc_aware(busy_end)
+            # Bucketed by calendar day, so skip anything outside working hours
+            if busy_start >= day_end or busy_end <= day_start:
+                continue
 
             # If there's a gap before this busy time
             if current_time + duration_delta <= busy_start:
@@ -143,11 +125,8 @@ async def find_overlap(
     # Limit to reasonable number of suggestions
     available_slots = available_slots[:10]
     
-    # Convert to dict format for response
-    slots_data = [slot.model_dump() for slot in available_slots]
-    
     return ApiResponse(
-        data=slots_data,
+        data=available_slots,
         message=f"Found {len(available_slots)} available time slots"
     )
 
@@ -160,27 +139,21 @@ async def get_user_busy_times(
     db = Depends(get_database)
 ):
     """Get busy times for the current user in a date range"""
-    if db is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database connection not available"
-        )
-    
-    # Get user's events in the date range
-    busy_times = []
-    async for event in db.events.find({
-        "$or": [
-            {"created_by": str(current_user.id)},
-            {"attendees": {"$in": [str(current_user.id)]}}
-        ],
-        "start_time": {"$gte": start_date, "$lt": end_date}
-    }):
-        busy_times.append({
-            "start_time": event["start_time"],
-            "end_time": event["end_time"],
-            "title": event.get("title", "Busy"),
-            "visibility": event.get("visibility", "private")
-        })
+    user_id = str(current_user.id)
+    # Get user's events in the date range, projected down to the busy-time fields
+    busy_times = await db.events.find(
+        {
+            "$or": [
+                {"created_by": user_id},
+                {"attendees": user_id}
+            ],
+            "start_time": {"$gte": start_date, "$lt": end_date}
+        },
+        {"_id": 0, "start_time": 1, "end_time": 1, "title": 1, "visibility": 1}
+    ).to_list(length=None)
+    for event in busy_times:
+        event.setdefault("title", "Busy")
+        event.setdefault("visibility", "private")
     
     return ApiResponse(
         data=busy_times,
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, WebSocket
+import asyncio
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request, Response, WebSocket
 from bson import ObjectId
 from ..models import EventCreate, EventUpdate, User, ApiResponse, EventMessageCreate, ChecklistItemCreate, ChecklistItemUpdate
 from ..auth import get_current_user, get_current_user_ws
-from ..database import get_database
+from ..utils import event_object_id, message_object_id, item_object_id, parse_object_id
+from .. import database as mongo
 # Import websocket functions - using absolute import to avoid relative import issues
 try:
     from app.websocket import handle_websocket_connection
@@ -10,25 +14,33 @@ except ImportError:
     # Fallback for when running as module
     from ..websocket import handle_websocket_connection
  
-from ..service_layer.events_service import get_events_service, EventsService
+from ..service_layer.events_service import get_events_service, get_event_access, EventsService
 from ..service_layer.event_messages_service import get_event_messages_service, EventMessagesService
 from ..service_layer.checklist_service import get_checklist_service, ChecklistService
 
 router = APIRouter(prefix="/events", tags=["events"])
+logger = logging.getLogger(__name__)
 
 
-@router.api_route("", methods=["GET"], response_model=ApiResponse)
-@router.api_route("/", methods=["GET"], response_model=ApiResponse, include_in_schema=False)
+@router.api_route("", methods=["GET"], response_model=ApiResponse, response_model_by_alias=False)
+@router.api_route("/", methods=["GET"], response_model=ApiResponse, response_model_by_alias=False, include_in_schema=False)
 async def get_events(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     events_service: EventsService = Depends(get_events_service),
 ):
     """Get all events for the current user"""
-    events = await events_service.get_events_for_user(current_user)
-    return ApiResponse(data=[e.model_dump(mode='json') for e in events], message="Events retrieved successfully")
+    events, etag = await events_service.get_events_for_user(current_user, request.headers.get("if-none-match"))
+    # no-cache: clients may keep the list but must revalidate it, which is answered with a bodyless 304
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if events is None:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return ApiResponse(data=events, message="Events retrieved successfully")
 
 
-@router.post("", response_model=ApiResponse)
+@router.post("", response_model=ApiResponse, response_model_by_alias=False)
 async def create_event(
     event_data: EventCreate,
     current_user: User = Depends(get_current_user),
@@ -36,125 +48,128 @@ async def create_event(
 ):
     """Create a new event"""
     event = await events_service.create_event(event_data, current_user)
-    return ApiResponse(data=event.model_dump(mode='json'), message="Event created successfully")
+    return ApiResponse(data=event, message="Event created successfully")
 
 
-@router.get("/{event_id}", response_model=ApiResponse)
+@router.get("/{event_id}", response_model=ApiResponse, response_model_by_alias=False)
 async def get_event(
-    event_id: str,
+    event_oid: ObjectId = Depends(event_object_id),
     current_user: User = Depends(get_current_user),
     events_service: EventsService = Depends(get_events_service),
 ):
     """Get a specific event by ID"""
-    event = await events_service.get_event_by_id(event_id, current_user)
-    return ApiResponse(data=event.model_dump(mode='json'), message="Event retrieved successfully")
+    event = await events_service.get_event_by_id(event_oid, current_user)
+    return ApiResponse(data=event, message="Event retrieved successfully")
 
 
-@router.put("/{event_id}", response_model=ApiResponse)
+@router.put("/{event_id}", response_model=ApiResponse, response_model_by_alias=False)
 async def update_event(
-    event_id: str,
     event_update: EventUpdate,
+    event_oid: ObjectId = Depends(event_object_id),
     current_user: User = Depends(get_current_user),
     events_service: EventsService = Depends(get_events_service),
 ):
     """Update an event"""
-    event = await events_service.update_event(event_id, event_update, current_user)
-    return ApiResponse(data=event.model_dump(mode='json'), message="Event updated successfully")
+    event = await events_service.update_event(event_oid, event_update, current_user)
+    return ApiResponse(data=event, message="Event updated successfully")
 
 
 @router.delete("/{event_id}", response_model=ApiResponse)
 async def delete_event(
-    event_id: str,
+    event_oid: ObjectId = Depends(event_object_id),
     current_user: User = Depends(get_current_user),
     events_service: EventsService = Depends(get_events_service),
 ):
     """Delete an event"""
-    await events_service.delete_event(event_id, current_user)
+    await events_service.delete_event(event_oid, current_user)
     return ApiResponse(message="Event deleted successfully")
 
 
 # Event Chat Endpoints
-@router.get("/{event_id}/messages", response_model=ApiResponse)
+@router.get("/{event_id}/messages", response_model=ApiResponse, response_model_by_alias=False)
 async def get_event_messages(
-    event_id: str,
+    event_oid: ObjectId = Depends(event_object_id),
+    limit: int = Query(100, ge=1, le=500),
+    before: Optional[str] = Query(None, description="Return messages older than this message ID"),
     current_user: User = Depends(get_current_user),
     messages_service: EventMessagesService = Depends(get_event_messages_service),
 ):
-    """Get all messages for an event"""
-    messages = await messages_service.list_messages(event_id, current_user)
-    return ApiResponse(data=[m.model_dump(mode='json') for m in messages], message="Messages retrieved successfully")
+    """Get a page of messages for an event, oldest first"""
+    before_oid = parse_object_id(before, "message") if before else None
+    messages = await messages_service.list_messages(event_oid, current_user, limit, before_oid)
+    return ApiResponse(data=messages, message="Messages retrieved successfully")
 
 
-@router.post("/{event_id}/messages", response_model=ApiResponse)
+@router.post("/{event_id}/messages", response_model=ApiResponse, response_model_by_alias=False)
 async def send_event_message(
-    event_id: str,
     message_data: EventMessageCreate,
+    event_oid: ObjectId = Depends(event_object_id),
     current_user: User = Depends(get_current_user),
     messages_service: EventMessagesService = Depends(get_event_messages_service),
 ):
     """Send a new message to an event"""
-    message = await messages_service.send_message(event_id, message_data, current_user)
-    return ApiResponse(data=message.model_dump(mode='json'), message="Message sent successfully")
+    message = await messages_service.send_message(event_oid, message_data, current_user)
+    return ApiResponse(data=message, message="Message sent successfully")
 
 
 @router.delete("/{event_id}/messages/{message_id}", response_model=ApiResponse)
 async def delete_event_message(
-    event_id: str,
-    message_id: str,
+    event_oid: ObjectId = Depends(event_object_id),
+    message_oid: ObjectId = Depends(message_object_id),
     current_user: User = Depends(get_current_user),
     messages_service: EventMessagesService = Depends(get_event_messages_service),
 ):
     """Delete a message (owner only)"""
-    await messages_service.delete_message(event_id, message_id, current_user)
+    await messages_service.delete_message(event_oid, message_oid, current_user)
     return ApiResponse(message="Message deleted successfully")
 
 
 # Event Checklist Endpoints
-@router.get("/{event_id}/checklist", response_model=ApiResponse)
+@router.get("/{event_id}/checklist", response_model=ApiResponse, response_model_by_alias=False)
 async def get_event_checklist(
-    event_id: str,
+    event_oid: ObjectId = Depends(event_object_id),
     current_user: User = Depends(get_current_user),
     checklist_service: ChecklistService = Depends(get_checklist_service),
 ):
     """Get all checklist items for an event"""
-    items = await checklist_service.list_items(event_id, current_user)
-    return ApiResponse(data=[i.model_dump(mode='json') for i in items], message="Checklist items retrieved successfully")
+    items = await checklist_service.list_items(event_oid, current_user)
+    return ApiResponse(data=items, message="Checklist items retrieved successfully")
 
 
-@router.post("/{event_id}/checklist", response_model=ApiResponse)
+@router.post("/{event_id}/checklist", response_model=ApiResponse, response_model_by_alias=False)
 async def create_checklist_item(
-    event_id: str,
     item_data: ChecklistItemCreate,
+    event_oid: ObjectId = Depends(event_object_id),
     current_user: User = Depends(get_current_user),
     checklist_service: ChecklistService = Depends(get_checklist_service),
 ):
     """Create a new checklist item for an event"""
-    item = await checklist_service.create_item(event_id, item_data, current_user)
-    return ApiResponse(data=item.model_dump(mode='json'), message="Checklist item created successfully")
+    item = await checklist_service.create_item(event_oid, item_data, current_user)
+    return ApiResponse(data=item, message="Checklist item created successfully")
 
 
-@router.put("/{event_id}/checklist/{item_id}", response_model=ApiResponse)
+@router.put("/{event_id}/checklist/{item_id}", response_model=ApiResponse, response_model_by_alias=False)
 async def update_checklist_item(
-    event_id: str,
-    item_id: str,
     item_update: ChecklistItemUpdate,
+    event_oid: ObjectId = Depends(event_object_id),
+    item_oid: ObjectId = Depends(item_object_id),
     current_user: User = Depends(get_current_user),
     checklist_service: ChecklistService = Depends(get_checklist_service),
 ):
     """Update a checklist item (toggle completion)"""
-    item = await checklist_service.update_item(event_id, item_id, item_update, current_user)
-    return ApiResponse(data=item.model_dump(mode='json'), message="Checklist item updated successfully")
+    item = await checklist_service.update_item(event_oid, item_oid, item_update, current_user)
+    return ApiResponse(data=item, message="Checklist item updated successfully")
 
 
 @router.delete("/{event_id}/checklist/{item_id}", response_model=ApiResponse)
 async def delete_checklist_item(
-    event_id: str,
-    item_id: str,
+    event_oid: ObjectId = Depends(event_object_id),
+    item_oid: ObjectId = Depends(item_object_id),
     current_user: User = Depends(get_current_user),
     checklist_service: ChecklistService = Depends(get_checklist_service),
 ):
     """Delete a checklist item"""
-    await checklist_service.delete_item(event_id, item_id, current_user)
+    await checklist_service.delete_item(event_oid, item_oid, current_user)
     return ApiResponse(message="Checklist item deleted successfully")
 
 
@@ -165,80 +180,65 @@ async def event_websocket(
     event_id: str
 ):
     """WebSocket endpoint for real-time event updates"""
-    import logging
-    logger = logging.getLogger(__name__)
-
-    logger.info(f"WebSocket connection attempt for event {event_id}")
+    # Runs on every (re)connect: failures log one line each, success logs once after accept
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("WebSocket connection attempt for event %s", event_id)
 
     # Extract token from query parameters (consistent with partner WebSocket)
-    query_params = websocket.query_params
-    token = query_params.get('token')
-
-    logger.info(f"Token extracted: {'present' if token else 'missing'}")
-    logger.info(f"Query params: {dict(query_params)}")
-
+    token = websocket.query_params.get('token')
     if not token:
-        logger.error("No token provided in WebSocket connection")
+        logger.warning("WebSocket for event %s rejected: no token", event_id)
         await websocket.close(code=1008)  # Policy violation
         return
 
-    # Authenticate user
-    logger.info("Attempting WebSocket user authentication...")
-    user = await get_current_user_ws(token)
-    if not user:
-        logger.error("WebSocket user authentication failed")
-        await websocket.close(code=4001)  # Custom code for unauthorized
-        return
-
-    logger.info(f"WebSocket user authenticated: {user.id}")
-
     # Validate ObjectId
     if not ObjectId.is_valid(event_id):
         await websocket.close(code=1003)  # Unsupported data
         return
 
-    # Check if event exists and user has access
-    logger.info("Checking database connection for event lookup...")
-    db = get_database()
-    if db is None:
-        logger.error("Database connection not available for WebSocket")
+    # Accept while authenticating and loading the event ACL; the three are independent, so the handshake
+    # no longer waits on the lookups. Accepting first also lets the client see the 4001/4003 close codes
+    # below (a close before accept reaches the browser as 1006), which is what triggers its token refresh.
+    accepted, user, access = await asyncio.gather(
+        websocket.accept(),
+        get_current_user_ws(token),
+        get_event_access(mongo.database, event_id),
+        return_exceptions=True,
+    )
+    if isinstance(accepted, Exception):
+        # Client went away mid-handshake; there is nothing to close
+        return
+    if isinstance(user, Exception) or isinstance(access, Exception):
+        logger.error("WebSocket for event %s rejected: handshake lookup failed: %s", event_id,
+                     user if isinstance(user, Exception) else access)
         await websocket.close(code=1011)  # Internal error
         return
+    if not user:
+        logger.warning("WebSocket for event %s rejected: authentication failed", event_id)
+        await websocket.close(code=4001)  # Custom code for unauthorized
+        return
 
-    logger.info(f"Looking up event: {event_id}")
-    event_doc = await db.events.find_one({"_id": ObjectId(event_id)})
-    if not event_doc:
-        logger.error(f"Event not found: {event_id}")
+    # Check if event exists and user has access
+    if access is None:
+        logger.warning("WebSocket rejected: event %s not found", event_id)
         await websocket.close(code=1003)  # Event not found
         return
 
-    logger.info(f"Event found: {event_doc.get('title', 'unknown')}")
-
-    # Access checks based on raw document to avoid model dependency here
+    # Access checks on the cached (creator, attendees) pair to avoid model dependency here
     user_id_str = str(user.id)
-    event_attendees = [str(attendee) for attendee in event_doc.get('attendees', [])]
-    event_creator = str(event_doc.get('created_by'))
+    event_creator, event_attendees = access
+    if debug:
+        logger.debug("Event %s access check: user=%s creator=%s attendees=%s",
+                     event_id, user_id_str, event_creator, sorted(event_attendees))
 
-    logger.info(f"User ID: {user_id_str}")
-    logger.info(f"Event attendees: {event_attendees}")
-    logger.info(f"Event creator: {event_creator}")
-
-    is_attendee = user_id_str in event_attendees
-    is_creator = event_creator == user_id_str
-
-    logger.info(f"Is attendee: {is_attendee}")
-    logger.info(f"Is creator: {is_creator}")
-
-    if not (is_attendee or is_creator):
-        logger.error(f"Access denied: user {user_id_str} is not attendee or creator of event {event_id}")
+    if user_id_str not in event_attendees and event_creator != user_id_str:
+        logger.warning("Access denied: user %s is not attendee or creator of event %s", user_id_str, event_id)
         await websocket.close(code=4003)  # Custom code for forbidden
         return
 
-    logger.info("Event access granted, proceeding with WebSocket connection")
-
-    # Accept the WebSocket connection before handling it
-    await websocket.accept()
-    logger.info("WebSocket connection accepted")
+    logger.info("WebSocket accepted for event %s (user %s)", event_id, user_id_str,
+                extra={"event_id": event_id, "user_id": user_id_str})
 
     # Handle the WebSocket connection
-    await handle_websocket_connection(websocket, event_id, user)
\ No newline at end of file
+    await handle_websocket_connection(websocket, event_id, user)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from ..models import User, ApiResponse, InviteTokenCreate
 from ..auth import get_current_user
-from ..database import get_database
+from .. import database as mongo
 from ..service_layer.partner_service import get_partner_service, PartnerService
 
 router = APIRouter(prefix="/partner", tags=["partner"])
@@ -27,7 +27,7 @@ async def check_invite_token(token: str, partner_service: PartnerService = Depen
 
 
 
-@router.post("/connect", response_model=ApiResponse)
+@router.post("/connect", response_model=ApiResponse, response_model_by_alias=False)
 async def connect_partner(
     token_data: dict,
     current_user: User = Depends(get_current_user),
@@ -38,10 +38,10 @@ async def connect_partner(
     if not token:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invite token is required")
     partner = await partner_service.connect_partner(token, current_user)
-    return ApiResponse(data=partner.model_dump(), message="Successfully connected with partner")
+    return ApiResponse(data=partner, message="Successfully connected with partner")
 
 
-@router.get("", response_model=ApiResponse)
+@router.get("", response_model=ApiResponse, response_model_by_alias=False)
 async def get_partner(
     current_user: User = Depends(get_current_user),
     partner_service: PartnerService = Depends(get_partner_service),
@@ -50,7 +50,7 @@ async def get_partner(
     partner = await partner_service.get_partner(current_user)
     if not partner:
         return ApiResponse(data=None, message="No active partnership found")
-    return ApiResponse(data=partner.model_dump(), message="Partner retrieved successfully")
+    return ApiResponse(data=partner, message="Partner retrieved successfully")
 
 
 @router.delete("", response_model=ApiResponse)
@@ -66,16 +66,10 @@ async def disconnect_partner(
 @router.get("/check-email/{email}", response_model=ApiResponse)
 async def check_email_registered(email: str):
     """Check if an email is already registered in the system."""
-    db = get_database()
-    if db is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database connection not available"
-        )
-
-    # Check if user exists with this email
-    user = await db.users.find_one({"email": email})
-    is_registered = user is not None
+    db = mongo.database
+
+    # Check if user exists with this email; answered from the unique email index without fetching the user
+    is_registered = await db.users.count_documents({"email": email}, limit=1) > 0
 
     return ApiResponse(
         data={"is_registered": is_registered, "email": email},
@@ -2,98 +2,85 @@ from datetime import datetime, timezone
 from typing import List
 from bson import ObjectId
 from fastapi import HTTPException, status
+from pydantic import TypeAdapter
 
-from ..models import Event, ChecklistItem, ChecklistItemCreate, ChecklistItemUpdate, User
-from ..database import get_database
+from ..models import ChecklistItem, ChecklistItemCreate, ChecklistItemUpdate, User
+from .. import database as mongo
+from .events_service import assert_event_access, fetch_with_event_access
 from ..websocket import manager
 from pymongo import ReturnDocument
 
 
+# Validates a whole listing in one pydantic-core call instead of one ChecklistItem(**doc) per row
+_CHECKLIST_LIST_ADAPTER = TypeAdapter(List[ChecklistItem])
+# Checklists rarely pass a couple hundred items, so one reply carries the whole list
+_CHECKLIST_BATCH_SIZE = 200
+
+
 class ChecklistService:
     def __init__(self, db):
         self.db = db
 
-    async def _get_event_with_access(self, event_id: str, user: User) -> Event:
-        if not ObjectId.is_valid(event_id):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid event ID")
-        event_doc = await self.db.events.find_one({"_id": ObjectId(event_id)})
-        if not event_doc:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
-        event = Event(**event_doc)
-        user_id_str = str(user.id)
-        if user_id_str not in [str(a) for a in event.attendees] and str(event.created_by) != user_id_str:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this event")
-        return event
-
-    async def list_items(self, event_id: str, user: User) -> List[ChecklistItem]:
-        _ = await self._get_event_with_access(event_id, user)
-        cursor = self.db.event_checklist_items.find({"event_id": event_id}).sort("created_at", 1)
-        return [ChecklistItem(**doc) async for doc in cursor]
+    async def list_items(self, event_oid: ObjectId, user: User) -> List[ChecklistItem]:
+        event_id = str(event_oid)
+        # The listing does not depend on the ACL result, so both queries run concurrently
+        docs = await fetch_with_event_access(
+            self.db, event_oid, str(user.id),
+            self.db.event_checklist_items.find({"event_id": event_id}).sort("created_at", 1).batch_size(_CHECKLIST_BATCH_SIZE).to_list(length=None),
+        )
+        return _CHECKLIST_LIST_ADAPTER.validate_python(docs)
 
-    async def create_item(self, event_id: str, item_data: ChecklistItemCreate, user: User) -> ChecklistItem:
-        _ = await self._get_event_with_access(event_id, user)
+    async def create_item(self, event_oid: ObjectId, item_data: ChecklistItemCreate, user: User) -> ChecklistItem:
+        await assert_event_access(self.db, event_oid, str(user.id))
+        event_id = str(event_oid)
         item_dict = item_data.model_dump()
         item_dict["event_id"] = event_id
         item_dict["created_by"] = str(user.id)
-        item_dict["created_at"] = datetime.now(timezone.utc)
-        item_dict["updated_at"] = datetime.now(timezone.utc)
-        result = await self.db.event_checklist_items.insert_one(item_dict)
-        created = await self.db.event_checklist_items.find_one({"_id": result.inserted_id})
-        if not created:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create checklist item")
-        item = ChecklistItem(**created)
-        await manager.broadcast_to_event(event_id, {"type": "new_checklist_item", "data": item.model_dump(mode='json')})
+        item_dict["created_at"] = item_dict["updated_at"] = datetime.now(timezone.utc)
+        # insert_one stamps the generated _id onto item_dict, so no read-back is needed
+        await self.db.event_checklist_items.insert_one(item_dict)
+        item = ChecklistItem(**item_dict)
+        manager.broadcast_to_event_nowait(event_id, {"type": "new_checklist_item", "data": item.model_dump(mode='json')})
 
         return item
 
-    async def update_item(self, event_id: str, item_id: str, item_update: ChecklistItemUpdate, user: User) -> ChecklistItem:
-        _ = await self._get_event_with_access(event_id, user)
-        if not ObjectId.is_valid(item_id):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid item ID")
-        # Validate exists
-        item_doc = await self.db.event_checklist_items.find_one({"_id": ObjectId(item_id), "event_id": event_id})
-        if not item_doc:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Checklist item not found")
+    async def update_item(self, event_oid: ObjectId, item_oid: ObjectId, item_update: ChecklistItemUpdate, user: User) -> ChecklistItem:
+        await assert_event_access(self.db, event_oid, str(user.id))
+        event_id = str(event_oid)
         update_data = item_update.model_dump(exclude_unset=True)
-        update_data["updated_at"] = datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc)
+        update_data["updated_at"] = now
         if "completed" in update_data:
             if update_data["completed"]:
                 update_data["completed_by"] = str(user.id)
-                update_data["completed_at"] = datetime.now(timezone.utc)
+                update_data["completed_at"] = now
             else:
                 update_data["completed_by"] = None
                 update_data["completed_at"] = None
         
+        # Scoping the filter to the event doubles as the existence check
         updated_doc = await self.db.event_checklist_items.find_one_and_update(
-            {"_id": ObjectId(item_id)},
+            {"_id": item_oid, "event_id": event_id},
             {"$set": update_data},
             return_document=ReturnDocument.AFTER,
         )
         if not updated_doc:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update checklist item")
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Checklist item not found")
         item = ChecklistItem(**updated_doc)
-        await manager.broadcast_to_event(event_id, {"type": "update_checklist_item", "data": item.model_dump(mode='json')})
+        manager.broadcast_to_event_nowait(event_id, {"type": "update_checklist_item", "data": item.model_dump(mode='json')})
         return item
 
-    async def delete_item(self, event_id: str, item_id: str, user: User) -> None:
-        _ = await self._get_event_with_access(event_id, user)
-        if not ObjectId.is_valid(item_id):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid item ID")
-        item_doc = await self.db.event_checklist_items.find_one({"_id": ObjectId(item_id), "event_id": event_id})
-        if not item_doc:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Checklist item not found")
-        # Only creator can delete
-        item = ChecklistItem(**item_doc)
-        if str(item.created_by) != str(user.id):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only item creator can delete this checklist item")
-        result = await self.db.event_checklist_items.delete_one({"_id": ObjectId(item_id)})
+    async def delete_item(self, event_oid: ObjectId, item_oid: ObjectId, user: User) -> None:
+        await assert_event_access(self.db, event_oid, str(user.id))
+        event_id = str(event_oid)
+        result = await self.db.event_checklist_items.delete_one({"_id": item_oid, "event_id": event_id, "created_by": str(user.id)})
         if result.deleted_count == 0:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete checklist item")
-        await manager.broadcast_to_event(event_id, {"type": "delete_checklist_item", "data": {"item_id": item_id}})
+            # Only the failure path pays for telling a missing item from someone else's
+            if not await self.db.event_checklist_items.count_documents({"_id": item_oid, "event_id": event_id}, limit=1):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Checklist item not found")
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only item creator can delete this checklist item")
+        manager.broadcast_to_event_nowait(event_id, {"type": "delete_checklist_item", "data": {"item_id": str(item_oid)}})
 
 
-def get_checklist_service() -> 'ChecklistService':
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database connection not available")
-    return ChecklistService(db)
+async def get_checklist_service() -> 'ChecklistService':
+    return ChecklistService(mongo.database)
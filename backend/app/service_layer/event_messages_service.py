@@ -1,68 +1,70 @@
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 from bson import ObjectId
 from fastapi import HTTPException, status
+from pydantic import TypeAdapter
 
-from ..models import Event, EventMessage, EventMessageCreate, User
-from ..database import get_database
+from ..models import EventMessage, EventMessageCreate, User
+from .. import database as mongo
+from .events_service import assert_event_access, fetch_with_event_access
 from ..websocket import manager
 
 
+# Validates a whole listing in one pydantic-core call instead of one EventMessage(**doc) per row
+_MESSAGE_LIST_ADAPTER = TypeAdapter(List[EventMessage])
+# Equal to the largest page, so a page always arrives in the first reply instead of the server default 101 docs + getMore
+_MESSAGE_BATCH_SIZE = 500
+
+
 class EventMessagesService:
     def __init__(self, db):
         self.db = db
 
-    async def _get_event_with_access(self, event_id: str, user: User) -> Event:
-        if not ObjectId.is_valid(event_id):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid event ID")
-        event_doc = await self.db.events.find_one({"_id": ObjectId(event_id)})
-        if not event_doc:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
-        event = Event(**event_doc)
-        user_id_str = str(user.id)
-        if user_id_str not in [str(a) for a in event.attendees] and str(event.created_by) != user_id_str:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this event")
-        return event
-
-    async def list_messages(self, event_id: str, user: User) -> List[EventMessage]:
-        _ = await self._get_event_with_access(event_id, user)
-        cursor = self.db.event_messages.find({"event_id": event_id}).sort("created_at", 1)
-        return [EventMessage(**doc) async for doc in cursor]
+    async def list_messages(
+        self, event_oid: ObjectId, user: User, limit: int = 100, before: Optional[ObjectId] = None
+    ) -> List[EventMessage]:
+        """Return up to `limit` messages older than `before` (newest page by default), oldest first"""
+        event_id = str(event_oid)
+        # Keyset pagination on _id (creation order) walks the (event_id, _id) index instead of the whole history
+        query = {"event_id": event_id}
+        if before is not None:
+            query["_id"] = {"$lt": before}
+        cursor = self.db.event_messages.find(query).sort("_id", -1).limit(limit).batch_size(_MESSAGE_BATCH_SIZE)
+        # The listing does not depend on the ACL result, so both queries run concurrently
+        docs = await fetch_with_event_access(self.db, event_oid, str(user.id), cursor.to_list(length=None))
+        docs.reverse()
+        return _MESSAGE_LIST_ADAPTER.validate_python(docs)
 
-    async def send_message(self, event_id: str, message_data: EventMessageCreate, user: User) -> EventMessage:
-        _ = await self._get_event_with_access(event_id, user)
-        message_dict = message_data.model_dump()
-        message_dict["event_id"] = event_id
-        message_dict["sender_id"] = str(user.id)
-        message_dict["created_at"] = datetime.now(timezone.utc)
-        message_dict["updated_at"] = datetime.now(timezone.utc)
-        result = await self.db.event_messages.insert_one(message_dict)
-        created = await self.db.event_messages.find_one({"_id": result.inserted_id})
-        if not created:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create message")
-        message = EventMessage(**created)
-        await manager.broadcast_to_event(event_id, {"type": "new_message", "data": message.model_dump(mode='json')})
+    async def send_message(self, event_oid: ObjectId, message_data: EventMessageCreate, user: User) -> EventMessage:
+        await assert_event_access(self.db, event_oid, str(user.id))
+        event_id = str(event_oid)
+        now = datetime.now(timezone.utc)
+        # The create model is a single str field, so build the document directly instead of running its serializer
+        message_dict = {
+            "message": message_data.message,
+            "event_id": event_id,
+            "sender_id": str(user.id),
+            "created_at": now,
+            "updated_at": now,
+        }
+        # insert_one stamps the generated _id onto message_dict, so no read-back is needed
+        await self.db.event_messages.insert_one(message_dict)
+        message = EventMessage(**message_dict)
+        manager.broadcast_to_event_nowait(event_id, {"type": "new_message", "data": message.model_dump(mode='json')})
 
         return message
 
-    async def delete_message(self, event_id: str, message_id: str, user: User) -> None:
-        _ = await self._get_event_with_access(event_id, user)
-        if not ObjectId.is_valid(message_id):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid message ID")
-        message_doc = await self.db.event_messages.find_one({"_id": ObjectId(message_id), "event_id": event_id})
-        if not message_doc:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found")
-        message = EventMessage(**message_doc)
-        if str(message.sender_id) != str(user.id):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only message sender can delete this message")
-        result = await self.db.event_messages.delete_one({"_id": ObjectId(message_id)})
+    async def delete_message(self, event_oid: ObjectId, message_oid: ObjectId, user: User) -> None:
+        await assert_event_access(self.db, event_oid, str(user.id))
+        event_id = str(event_oid)
+        # Sender check is part of the filter, so the ownership test and the delete are one atomic round trip
+        result = await self.db.event_messages.delete_one({"_id": message_oid, "event_id": event_id, "sender_id": str(user.id)})
         if result.deleted_count == 0:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete message")
-        await manager.broadcast_to_event(event_id, {"type": "delete_message", "data": {"message_id": message_id}})
+            if not await self.db.event_messages.count_documents({"_id": message_oid, "event_id": event_id}, limit=1):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found")
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only message sender can delete this message")
+        manager.broadcast_to_event_nowait(event_id, {"type": "delete_message", "data": {"message_id": str(message_oid)}})
 
 
-def get_event_messages_service() -> EventMessagesService:
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database connection not available")
-    return EventMessagesService(db)
+async def get_event_messages_service() -> EventMessagesService:
+    return EventMessagesService(mongo.database)
@@ -1,34 +1,142 @@
+import asyncio
+import hashlib
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Awaitable, Dict, FrozenSet, List, Optional, Tuple, TypeVar
 from bson import ObjectId
+from cachetools import TTLCache
+from pydantic import TypeAdapter
 from fastapi import HTTPException, status
 from pymongo import ReturnDocument
 
 from ..models import Event, EventCreate, EventUpdate, User
-from ..database import get_database
+from .. import database as mongo
 from ..services import notification_service
 
+# Validates a whole events page in one pydantic-core call instead of one Event(**doc) per row
+_EVENT_LIST_ADAPTER = TypeAdapter(List[Event])
+
+def _events_etag(user_id: str, partner_id: Optional[str], count: int, last_updated: Optional[datetime]) -> str:
+    """Weak ETag for a user's events list.
+
+    Every write to an event bumps its updated_at and removals change the count, so
+    (viewer, partner, count, max(updated_at)) changes whenever the visible list does.
+    """
+    stamp = last_updated.isoformat() if last_updated is not None else ""
+    digest = hashlib.blake2b(f"{user_id}:{partner_id}:{count}:{stamp}".encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _member_clauses(user_id: str) -> List[dict]:
+    """$or clauses matching events the user created or attends; each one is served by its own index"""
+    return [{"created_by": user_id}, {"attendees": user_id}]
+
+
+# Short-lived per-process cache of (creator, attendees) for WebSocket (re)connect checks;
+# update_event/delete_event call invalidate_event_access()
+_event_access_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_event_access_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def assert_event_access(db, event_oid: ObjectId, user_id: str) -> None:
+    """Raise 404/403 unless user_id created or attends the event.
+
+    The ACL is part of the query filter, so the common (allowed) case is one
+    round trip returning only the _id; the 404-vs-403 lookup only runs on failure.
+    """
+    allowed = await db.events.find_one(
+        {"_id": event_oid, "$or": _member_clauses(user_id)},
+        {"_id": 1},
+    )
+    if allowed is None:
+        if not await db.events.count_documents({"_id": event_oid}, limit=1):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this event")
+
+
+_T = TypeVar("_T")
+
+
+async def fetch_with_event_access(db, event_oid: ObjectId, user_id: str, fetch: Awaitable[_T]) -> _T:
+    """Run fetch concurrently with assert_event_access and return its result only if access is granted.
+
+    When the check raises, the fetch is cancelled and awaited before the error propagates,
+    so a denied caller never leaves a query running in the background.
+    """
+    fetch_task = asyncio.ensure_future(fetch)
+    try:
+        await assert_event_access(db, event_oid, user_id)
+    except BaseException:
+        fetch_task.cancel()
+        await asyncio.gather(fetch_task, return_exceptions=True)
+        raise
+    return await fetch_task
+
+
+def invalidate_event_access(event_id: str) -> None:
+    """Drop an event from the in-process access cache after it has been modified"""
+    _event_access_cache.pop(event_id, None)
+
+
+async def get_event_access(db, event_id: str) -> Optional[Tuple[str, FrozenSet[str]]]:
+    """Return (creator, attendees) for an event, served from the short-TTL cache when possible"""
+    access = _event_access_cache.get(event_id)
+    if access is not None:
+        return access
+
+    # Collapse concurrent misses for the same event into a single Mongo query
+    lock = _event_access_locks.setdefault(event_id, asyncio.Lock())
+    async with lock:
+        access = _event_access_cache.get(event_id)
+        if access is None:
+            doc = await db.events.find_one({"_id": ObjectId(event_id)}, {"created_by": 1, "attendees": 1})
+            if doc is not None:
+                access = (str(doc.get("created_by")), frozenset(str(a) for a in doc.get("attendees", [])))
+                _event_access_cache[event_id] = access
+    if not lock.locked():
+        _event_access_locks.pop(event_id, None)
+    return access
+
 
 class EventsService:
     def __init__(self, db):
         self.db = db
 
-    async def get_events_for_user(self, user: User) -> List[Event]:
+    async def get_events_for_user(
+        self, user: User, if_none_match: Optional[str] = None
+    ) -> Tuple[Optional[List[Event]], str]:
+        """Return (events, etag); events is None when if_none_match still matches the current list"""
         user_id = str(user.id)
         partner_id = await self._get_partner_id(user_id)
         # Current user should see:
         # - events they created
         # - events they attend
         # - partner's events with visibility == shared, even if not an attendee
-        or_conditions = [
-            {"created_by": user_id},
-            {"attendees": {"$in": [user_id]}},
-        ]
+        or_conditions = _member_clauses(user_id)
         if partner_id:
             or_conditions.append({"visibility": "shared", "created_by": partner_id})
-
-        cursor = self.db.events.find({"$or": or_conditions})
-        return [Event(**doc) async for doc in cursor]
+        query = {"$or": or_conditions}
+
+        if if_none_match:
+            # Revalidation: fingerprint the list server-side and skip shipping/validating the documents
+            summary = await self.db.events.aggregate([
+                {"$match": query},
+                {"$group": {"_id": None, "count": {"$sum": 1}, "last_updated": {"$max": "$updated_at"}}},
+            ]).to_list(length=1)
+            count, last_updated = (summary[0]["count"], summary[0]["last_updated"]) if summary else (0, None)
+            # $max ranks dates above strings, so this is only a non-datetime when every match has a legacy
+            # value; the full path below ignores those too, keeping both ETags identical
+            if not isinstance(last_updated, datetime):
+                last_updated = None
+            etag = _events_etag(user_id, partner_id, count, last_updated)
+            if if_none_match == etag:
+                return None, etag
+
+        docs = await self.db.events.find(query).to_list(length=None)
+        last_updated = max(
+            (doc["updated_at"] for doc in docs if isinstance(doc.get("updated_at"), datetime)), default=None
+        )
+        etag = _events_etag(user_id, partner_id, len(docs), last_updated)
+        return _EVENT_LIST_ADAPTER.validate_python(docs), etag
 
     async def _get_partner_id(self, user_id: str) -> Optional[str]:
         partnership = await self.db.partnerships.find_one({
@@ -36,86 +144,88 @@ class EventsService:
                 {"user1_id": user_id, "status": "accepted"},
                 {"user2_id": user_id, "status": "accepted"}
             ]
-        })
+        }, {"_id": 0, "user1_id": 1, "user2_id": 1})
         if not partnership:
             return None
         return partnership["user2_id"] if partnership["user1_id"] == user_id else partnership["user1_id"]
 
     async def create_event(self, event_data: EventCreate, user: User) -> Event:
+        user_id = str(user.id)
         event_dict = event_data.model_dump()
-        event_dict["created_by"] = str(user.id)
-        event_dict["created_at"] = datetime.now(timezone.utc)
-        event_dict["updated_at"] = datetime.now(timezone.utc)
+        # Attendee ids are stored as strings; python-mode dumps leave them as ObjectId
+        event_dict["attendees"] = [str(attendee) for attendee in event_data.attendees]
+        event_dict["created_by"] = user_id
+        event_dict["created_at"] = event_dict["updated_at"] = datetime.now(timezone.utc)
 
         # Always ensure creator is included
-        if str(user.id) not in event_dict["attendees"]:
-            event_dict["attendees"].append(str(user.id))
+        if user_id not in event_dict["attendees"]:
+            event_dict["attendees"].append(user_id)
 
         # Respect explicit attendees from frontend; do not auto-append partner.
-        partner_id = await self._get_partner_id(str(user.id))
+        partner_id = await self._get_partner_id(user_id)
         visibility = event_dict.get("visibility", "shared")
 
-        result = await self.db.events.insert_one(event_dict)
-        created = await self.db.events.find_one({"_id": result.inserted_id})
-        if not created:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create event")
-
-        event = Event(**created)
+        # insert_one stamps the generated _id onto event_dict, so no read-back is needed
+        await self.db.events.insert_one(event_dict)
+        event = Event(**event_dict)
         # Notify partner for shared events, even if not an attendee (FYI visibility)
         if visibility == "shared" and partner_id:
             await notification_service.notify_event_created(partner_id, event.model_dump(mode='json'))
         return event
 
-    async def get_event_by_id(self, event_id: str, user: User) -> Event:
-        if not ObjectId.is_valid(event_id):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid event ID")
-        doc = await self.db.events.find_one({"_id": ObjectId(event_id)})
+    async def get_event_by_id(self, event_oid: ObjectId, user: User) -> Event:
+        doc = await self.db.events.find_one({"_id": event_oid})
         if not doc:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
-        event = Event(**doc)
-        user_id_str = str(user.id)
-        if user_id_str not in [str(a) for a in event.attendees] and str(event.created_by) != user_id_str:
+        # Check access on the raw document (ids are stored as strings) before paying for model validation
+        user_id = str(user.id)
+        created_by = doc.get("created_by")
+        if created_by != user_id and user_id not in doc.get("attendees", ()):
             # Allow partner to view details of shared events created by their partner (FYI visibility)
             try:
-                partner_id = await self._get_partner_id(user_id_str)
+                partner_id = await self._get_partner_id(user_id)
             except Exception:
                 partner_id = None
-            if not (partner_id and str(event.created_by) == partner_id and event.visibility == "shared"):
+            if not (partner_id and created_by == partner_id and doc.get("visibility", "shared") == "shared"):
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this event")
-        return event
-
-    async def update_event(self, event_id: str, event_update: EventUpdate, user: User) -> Event:
-        event = await self.get_event_by_id(event_id, user)
-        if str(event.created_by) != str(user.id):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only event creator can update this event")
+        return Event(**doc)
 
+    async def update_event(self, event_oid: ObjectId, event_update: EventUpdate, user: User) -> Event:
         update_data = event_update.model_dump(exclude_unset=True)
+        if update_data.get("attendees") is not None:
+            update_data["attendees"] = [str(attendee) for attendee in update_data["attendees"]]
         update_data["updated_at"] = datetime.now(timezone.utc)
+        # Creator check is part of the filter, so the update and the read-back are one round trip
         updated = await self.db.events.find_one_and_update(
-            {"_id": ObjectId(event_id)},
+            {"_id": event_oid, "created_by": str(user.id)},
             {"$set": update_data},
             return_document=ReturnDocument.AFTER
         )
         if not updated:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update event")
+            await self._raise_not_found_or_forbidden(event_oid, "Only event creator can update this event")
+        invalidate_event_access(str(event_oid))
         return Event(**updated)
 
-    async def delete_event(self, event_id: str, user: User) -> None:
-        event = await self.get_event_by_id(event_id, user)
-        if str(event.created_by) != str(user.id):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only event creator can delete this event")
+    async def _raise_not_found_or_forbidden(self, event_oid: ObjectId, forbidden_detail: str) -> None:
+        # Only the failure path of a creator-filtered write pays for this lookup
+        if not await self.db.events.count_documents({"_id": event_oid}, limit=1):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=forbidden_detail)
 
-        result = await self.db.events.delete_one({"_id": ObjectId(event_id)})
+    async def delete_event(self, event_oid: ObjectId, user: User) -> None:
+        user_id = str(user.id)
+        result = await self.db.events.delete_one({"_id": event_oid, "created_by": user_id})
         if result.deleted_count == 0:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete event")
+            await self._raise_not_found_or_forbidden(event_oid, "Only event creator can delete this event")
+        event_id = str(event_oid)
+        invalidate_event_access(event_id)
 
-        partner_id = await self._get_partner_id(str(user.id))
+        partner_id = await self._get_partner_id(user_id)
         if partner_id:
             await notification_service.notify_event_deleted(partner_id, event_id)
 
 
-def get_events_service() -> EventsService:
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database connection not available")
-    return EventsService(db)
+async def get_events_service() -> EventsService:
+    # async so FastAPI resolves it on the event loop instead of hopping to the threadpool per request;
+    # the handle is set once in the lifespan, which fails startup if it is missing
+    return EventsService(mongo.database)
@@ -5,11 +5,16 @@ from bson import ObjectId
 import secrets
 
 from ..models import User, Partner, InviteTokenCreate
-from ..database import get_database
+from .. import database as mongo
 from ..config import settings
+from ..email import queue_partnership_invitation
 from ..services import notification_service
 
 
+# Partner responses only expose these; skips shipping password hashes and preferences over the wire
+_PARTNER_USER_PROJECTION = {"display_name": 1, "timezone": 1}
+
+
 class PartnerService:
     def __init__(self, db):
         self.db = db
@@ -27,6 +32,9 @@ class PartnerService:
         await self.db.invite_tokens.insert_one(invite_token_dict)
         base = settings.FRONTEND_BASE_URL.rstrip('/')
         invite_url = f"{base}/invite/{token}"
+        if invite_data.invitee_email:
+            # Delivered by the background email workers, so the response does not wait on SMTP
+            queue_partnership_invitation(user.display_name, invite_data.invitee_email, invite_url)
         return {"invite_token": token, "invite_url": invite_url, "expires_at": expires_at.isoformat()}
 
     async def _get_valid_invite(self, token: str) -> dict:
@@ -41,7 +49,9 @@ class PartnerService:
 
     async def check_invite_token(self, token: str) -> dict:
         invite_token = await self._get_valid_invite(token)
-        inviter = await self.db.users.find_one({"_id": ObjectId(invite_token["created_by"])})
+        inviter = await self.db.users.find_one(
+            {"_id": ObjectId(invite_token["created_by"])}, {"display_name": 1, "email": 1}
+        )
         if not inviter:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inviter not found")
         return {
@@ -60,13 +70,13 @@ class PartnerService:
         if inviter_id == str(user.id):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You cannot connect with yourself")
 
-        existing_partnership = await self.db.partnerships.find_one({
+        already_connected = await self.db.partnerships.count_documents({
             "$or": [
                 {"user1_id": str(user.id), "user2_id": inviter_id, "status": "accepted"},
                 {"user1_id": inviter_id, "user2_id": str(user.id), "status": "accepted"},
             ]
-        })
-        if existing_partnership:
+        }, limit=1)
+        if already_connected:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="You are already connected with this user")
 
         partnership_dict = {
@@ -84,7 +94,7 @@ class PartnerService:
             {"$set": {"used": True, "used_by": str(user.id)}}
         )
 
-        partner_user = await self.db.users.find_one({"_id": ObjectId(inviter_id)})
+        partner_user = await self.db.users.find_one({"_id": ObjectId(inviter_id)}, _PARTNER_USER_PROJECTION)
         if not partner_user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Partner user not found")
 
@@ -106,11 +116,11 @@ class PartnerService:
                 {"user1_id": str(user.id), "status": "accepted"},
                 {"user2_id": str(user.id), "status": "accepted"},
             ]
-        })
+        }, {"user1_id": 1, "user2_id": 1, "accepted_at": 1})
         if not partnership:
             return None
         partner_id = partnership["user2_id"] if partnership["user1_id"] == str(user.id) else partnership["user1_id"]
-        partner_user = await self.db.users.find_one({"_id": ObjectId(partner_id)})
+        partner_user = await self.db.users.find_one({"_id": ObjectId(partner_id)}, _PARTNER_USER_PROJECTION)
         if not partner_user:
             return None
         return Partner(**{
@@ -128,22 +138,19 @@ class PartnerService:
                 {"user1_id": str(user.id), "status": "accepted"},
                 {"user2_id": str(user.id), "status": "accepted"},
             ]
-        })
+        }, {"user1_id": 1, "user2_id": 1})
         if not partnership:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No active partnership found")
         partner_id = partnership["user2_id"] if partnership["user1_id"] == str(user.id) else partnership["user1_id"]
         await self.db.partnerships.update_one({"_id": partnership["_id"]}, {"$set": {"status": "declined"}})
-        partner_user = await self.db.users.find_one({"_id": ObjectId(partner_id)})
-        if partner_user:
+        if await self.db.users.count_documents({"_id": ObjectId(partner_id)}, limit=1):
             await notification_service.notify_partner_disconnection(partner_id, str(user.id))
 
     async def check_email_registered(self, email: str) -> dict:
-        user = await self.db.users.find_one({"email": email})
-        return {"is_registered": user is not None, "email": email}
+        # Existence only: answered from the unique email index without fetching the user
+        is_registered = await self.db.users.count_documents({"email": email}, limit=1) > 0
+        return {"is_registered": is_registered, "email": email}
 
 
-def get_partner_service():
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database connection not available")
-    return PartnerService(db)
+async def get_partner_service():
+    return PartnerService(mongo.database)
@@ -4,7 +4,7 @@ from bson import ObjectId
 from pymongo import ReturnDocument
 
 from .. import models
-from ..database import get_database
+from .. import database as mongo
 from ..services import notification_service
 
 
@@ -26,15 +26,14 @@ class ProposalService:
         if str(proposal_data.proposed_to) == str(user.id):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot propose to yourself")
 
-        proposed_to_user = await self.db.users.find_one({"_id": ObjectId(proposal_data.proposed_to)})
-        if not proposed_to_user:
+        if not await self.db.users.count_documents({"_id": ObjectId(proposal_data.proposed_to)}, limit=1):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Proposed recipient not found")
 
         proposal_dict = proposal_data.model_dump()
+        proposal_dict["proposed_to"] = str(proposal_data.proposed_to)
         proposal_dict["proposed_by"] = str(user.id)
         proposal_dict["status"] = "pending"
-        proposal_dict["created_at"] = datetime.now(timezone.utc)
-        proposal_dict["updated_at"] = datetime.now(timezone.utc)
+        proposal_dict["created_at"] = proposal_dict["updated_at"] = datetime.now(timezone.utc)
 
         result = await self.db.proposals.insert_one(proposal_dict)
         created_proposal = await self.db.proposals.find_one({"_id": result.inserted_id})
@@ -48,8 +47,8 @@ class ProposalService:
         )
         return proposal
 
-    async def accept_proposal(self, proposal_id: str, selected_time_slot: models.TimeSlot, user: models.User):
-        proposal = await self.get_proposal_by_id(proposal_id, user)
+    async def accept_proposal(self, proposal_oid: ObjectId, selected_time_slot: models.TimeSlot, user: models.User):
+        proposal = await self.get_proposal_by_id(proposal_oid, user)
 
         if str(proposal.proposed_to) != str(user.id):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only the proposal recipient can accept it")
@@ -60,7 +59,7 @@ class ProposalService:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Selected time slot is not among the proposed times")
 
         updated_proposal_doc = await self.db.proposals.find_one_and_update(
-            {"_id": ObjectId(proposal_id)},
+            {"_id": proposal_oid},
             {
                 "$set": {
                     "status": "accepted",
@@ -84,8 +83,8 @@ class ProposalService:
         event = await self._create_event_from_proposal(updated_proposal)
         return updated_proposal, event
 
-    async def decline_proposal(self, proposal_id: str, user: models.User):
-        proposal = await self.get_proposal_by_id(proposal_id, user)
+    async def decline_proposal(self, proposal_oid: ObjectId, user: models.User):
+        proposal = await self.get_proposal_by_id(proposal_oid, user)
 
         if str(proposal.proposed_to) != str(user.id):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only the proposal recipient can decline it")
@@ -93,7 +92,7 @@ class ProposalService:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Proposal has already been responded to")
 
         updated_proposal_doc = await self.db.proposals.find_one_and_update(
-            {"_id": ObjectId(proposal_id)},
+            {"_id": proposal_oid},
             {"$set": {"status": "declined", "updated_at": datetime.now(timezone.utc)}},
             return_document=ReturnDocument.AFTER
         )
@@ -109,11 +108,8 @@ class ProposalService:
         )
         return updated_proposal
 
-    async def get_proposal_by_id(self, proposal_id: str, user: models.User):
-        if not ObjectId.is_valid(proposal_id):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid proposal ID")
-        
-        proposal_doc = await self.db.proposals.find_one({"_id": ObjectId(proposal_id)})
+    async def get_proposal_by_id(self, proposal_oid: ObjectId, user: models.User):
+        proposal_doc = await self.db.proposals.find_one({"_id": proposal_oid})
         if not proposal_doc:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Proposal not found")
         
@@ -127,6 +123,7 @@ class ProposalService:
         if proposal.accepted_time_slot is None:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Accepted proposal missing time slot")
 
+        now = datetime.now(timezone.utc)
         event_dict = {
             "title": proposal.title,
             "description": proposal.description,
@@ -137,8 +134,8 @@ class ProposalService:
             "attendees": [str(proposal.proposed_by), str(proposal.proposed_to)],
             "created_by": str(proposal.proposed_by),
             "reminders": [10],
-            "created_at": datetime.now(timezone.utc),
-            "updated_at": datetime.now(timezone.utc)
+            "created_at": now,
+            "updated_at": now
         }
         event_result = await self.db.events.insert_one(event_dict)
         created_event_doc = await self.db.events.find_one({"_id": event_result.inserted_id})
@@ -153,8 +150,5 @@ class ProposalService:
         return event
 
 
-def get_proposal_service():
-    db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database connection not available")
-    return ProposalService(db, notification_service)
+async def get_proposal_service():
+    return ProposalService(mongo.database, notification_service)
@@ -1,7 +1,12 @@
 from datetime import datetime, timezone
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
 
 def serialize_for_json(obj):
-    """Recursively convert datetimes to ISO strings to make payload JSON-serializable."""
+    """Recursively convert datetimes and ObjectIds to strings to make payload JSON-serializable."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
     if isinstance(obj, datetime):
         # Ensure timezone-aware and serialize
         if obj.tzinfo is None:
@@ -14,3 +19,34 @@ def serialize_for_json(obj):
     if isinstance(obj, tuple):
         return tuple(serialize_for_json(v) for v in obj)
     return obj
+
+
+def parse_object_id(value: str, label: str) -> ObjectId:
+    """Parse an id string into an ObjectId, raising 400 when it is malformed."""
+    # A single constructor call both validates and parses, unlike is_valid() followed by ObjectId()
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid {label} ID")
+
+
+# Path dependencies: each parses its path segment once per request and hands the ObjectId down.
+# They are async so FastAPI does not dispatch them to the threadpool.
+async def event_object_id(event_id: str) -> ObjectId:
+    return parse_object_id(event_id, "event")
+
+
+async def message_object_id(message_id: str) -> ObjectId:
+    return parse_object_id(message_id, "message")
+
+
+async def item_object_id(item_id: str) -> ObjectId:
+    return parse_object_id(item_id, "item")
+
+
+async def task_object_id(task_id: str) -> ObjectId:
+    return parse_object_id(task_id, "task")
+
+
+async def proposal_object_id(proposal_id: str) -> ObjectId:
+    return parse_object_id(proposal_id, "proposal")
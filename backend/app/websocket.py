@@ -2,6 +2,7 @@ from typing import Dict, List, Optional, Deque, Any
 from fastapi import WebSocket, WebSocketDisconnect
 import json
 import logging
+import orjson
 import asyncio
 from datetime import datetime, timezone
 from collections import defaultdict, deque
@@ -19,6 +20,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Naive datetimes are UTC and UTC renders as 'Z', matching serialize_for_json + send_json output
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
 
 class ConnectionManager:
     def __init__(self):
@@ -38,6 +42,9 @@ class ConnectionManager:
         self.heartbeat_tasks: Dict[str, asyncio.Task] = {}
         self.last_heartbeat: Dict[str, datetime] = {}
 
+        # event_id -> most recently scheduled background broadcast, so fanouts to a room keep their order
+        self.broadcast_tails: Dict[str, asyncio.Task] = {}
+
         # Shutdown flag
         self.shutting_down = False
 
@@ -111,25 +118,45 @@ class ConnectionManager:
         if event_id not in self.active_connections:
             return
 
-        disconnected = []
-        for conn_info in self.active_connections[event_id]:
-            websocket = conn_info['websocket']
-            user_id = conn_info['user_id']
+        targets = [c for c in self.active_connections[event_id] if c['websocket'] != exclude_websocket]
+        if not targets:
+            return
 
-            if websocket == exclude_websocket:
-                continue
+        # Encode once for the whole room and send to every connection concurrently
+        payload = orjson.dumps(message, option=_ORJSON_OPTIONS).decode()
+        results = await asyncio.gather(*(c['websocket'].send_text(payload) for c in targets), return_exceptions=True)
 
-            try:
-                await websocket.send_json(serialize_for_json(message))
-                conn_info['last_activity'] = datetime.now(timezone.utc)
-            except Exception as e:
-                logger.error(f"Failed to send message to user {user_id} in event {event_id}: {e}")
-                disconnected.append(websocket)
+        now = datetime.now(timezone.utc)
+        disconnected = []
+        for conn_info, result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to send message to user {conn_info['user_id']} in event {event_id}: {result}")
+                disconnected.append(conn_info['websocket'])
+            else:
+                conn_info['last_activity'] = now
 
         # Clean up disconnected connections
         for ws in disconnected:
             await self.disconnect(ws, event_id)
 
+    def broadcast_to_event_nowait(self, event_id: str, message: dict):
+        """Schedule a room broadcast in the background so the caller does not wait on the fanout"""
+        if event_id not in self.active_connections:
+            return
+        # Each broadcast waits for the previous one to the same room, so clients see writes in order
+        task = asyncio.create_task(self._broadcast_after(self.broadcast_tails.get(event_id), event_id, message))
+        self.broadcast_tails[event_id] = task
+        task.add_done_callback(lambda t: self.broadcast_tails.pop(event_id, None) if self.broadcast_tails.get(event_id) is t else None)
+
+    async def _broadcast_after(self, previous: Optional[asyncio.Task], event_id: str, message: dict):
+        if previous is not None:
+            # wait() rather than await, so a failed predecessor does not cancel this broadcast
+            await asyncio.wait((previous,))
+        try:
+            await self.broadcast_to_event(event_id, message)
+        except Exception as e:
+            logger.error(f"Background broadcast to event {event_id} failed: {e}")
+
     async def connect_partner(self, websocket: WebSocket, user: User) -> bool:
         """Connect a WebSocket for partner notifications"""
         user_id = str(user.id)
@@ -284,9 +311,11 @@ class ConnectionManager:
         logger.info("Shutting down WebSocket ConnectionManager...")
         self.shutting_down = True
 
-        # Cancel all heartbeat tasks
+        # Cancel all heartbeat tasks and pending background broadcasts
         for task in self.heartbeat_tasks.values():
             task.cancel()
+        for task in self.broadcast_tails.values():
+            task.cancel()
 
         # Close all connections
         for room_connections in self.active_connections.values():
@@ -310,6 +339,7 @@ class ConnectionManager:
         self.message_queues.clear()
         self.heartbeat_tasks.clear()
         self.last_heartbeat.clear()
+        self.broadcast_tails.clear()
 
         logger.info("WebSocket ConnectionManager shutdown complete")
 
@@ -0,0 +1,166 @@
+"""Small in-memory stand-in for the Motor collection calls the services make."""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+
+def _values(doc_val):
+    # Mongo matches a scalar condition against any element of an array field
+    return doc_val if isinstance(doc_val, list) else [doc_val]
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(_matches(doc, q) for q in cond):
+                return False
+            continue
+        doc_val = doc.get(key)
+        if isinstance(cond, dict):
+            for op, arg in cond.items():
+                if op == "$in":
+                    ok = any(v in arg for v in _values(doc_val))
+                elif op == "$lt":
+                    ok = doc_val is not None and doc_val < arg
+                elif op == "$gt":
+                    ok = doc_val is not None and doc_val > arg
+                elif op == "$ne":
+                    ok = doc_val != arg
+                else:
+                    raise NotImplementedError(op)
+                if not ok:
+                    return False
+        elif cond not in _values(doc_val):
+            return False
+    return True
+
+
+def _stored(doc):
+    # BSON dates come back naive UTC, as they do from a real server
+    return {
+        k: v.astimezone(timezone.utc).replace(tzinfo=None) if isinstance(v, datetime) and v.tzinfo else v
+        for k, v in doc.items()
+    }
+
+
+def _project(doc, projection):
+    if not projection:
+        return dict(doc)
+    keep = {k for k, v in projection.items() if v}
+    out = {k: v for k, v in doc.items() if k in keep}
+    if "_id" in doc and projection.get("_id", 1):
+        out["_id"] = doc["_id"]
+    return out
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def sort(self, key, direction=1):
+        self._docs.sort(key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self._docs = self._docs[:n]
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._docs) if length is None else self._docs[:length]
+
+    def __aiter__(self):
+        self._iter = iter(self._docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    def __init__(self, docs=(), unique=None):
+        self.docs = [_stored(d) for d in docs]
+        # Optional tuple of field names enforced like a unique index
+        self.unique = unique
+        self.find_calls = 0
+
+    def find(self, query=None, projection=None):
+        self.find_calls += 1
+        return FakeCursor(_project(d, projection) for d in self.docs if _matches(d, query or {}))
+
+    async def find_one(self, query, projection=None):
+        for d in self.docs:
+            if _matches(d, query):
+                return _project(d, projection)
+        return None
+
+    async def count_documents(self, query, limit=None):
+        n = sum(1 for d in self.docs if _matches(d, query))
+        return min(n, limit) if limit else n
+
+    async def insert_one(self, doc):
+        doc.setdefault("_id", ObjectId())
+        self.docs.append(_stored(doc))
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs, ordered=True):
+        errors = []
+        for i, doc in enumerate(docs):
+            key = tuple(doc.get(f) for f in self.unique) if self.unique else None
+            if key is not None and any(tuple(d.get(f) for f in self.unique) == key for d in self.docs):
+                errors.append({"index": i, "code": 11000, "errmsg": "E11000 duplicate key error"})
+                if ordered:
+                    break
+                continue
+            doc.setdefault("_id", ObjectId())
+            self.docs.append(_stored(doc))
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": [], "nInserted": len(docs) - len(errors)})
+
+    async def find_one_and_update(self, query, update, return_document=None):
+        for d in self.docs:
+            if _matches(d, query):
+                d.update(_stored(update["$set"]))
+                return dict(d)
+        return None
+
+    async def update_one(self, query, update):
+        doc = await self.find_one_and_update(query, update)
+        return SimpleNamespace(matched_count=int(doc is not None), modified_count=int(doc is not None))
+
+    async def delete_one(self, query):
+        for i, d in enumerate(self.docs):
+            if _matches(d, query):
+                del self.docs[i]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    def aggregate(self, pipeline):
+        # Only the events-list fingerprint: $match followed by a count / $max(updated_at) $group
+        match, group = pipeline
+        matched = [d for d in self.docs if _matches(d, match["$match"])]
+        if not matched:
+            return FakeCursor([])
+        field = group["$group"]["last_updated"]["$max"].lstrip("$")
+        values = [d[field] for d in matched if field in d]
+        # BSON orders dates above strings, so any datetime wins over legacy string values
+        dates = [v for v in values if not isinstance(v, str)]
+        last = max(dates) if dates else (max(values) if values else None)
+        return FakeCursor([{"_id": None, "count": len(matched), "last_updated": last}])
+
+
+class FakeDB:
+    def __init__(self, **collections):
+        self._collections = collections
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._collections.setdefault(name, FakeCollection())
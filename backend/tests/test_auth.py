@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime
+
+import bcrypt
+import pytest
+from bson import ObjectId
+
+from app import auth
+from app import database as mongo
+
+from fake_mongo import FakeCollection, FakeDB
+
+
+def _bcrypt_hash(password, prefix="$2b$"):
+    # Cost 4 keeps the test fast; the prefix swap mimics hashes written by PHP ($2y$) or older libs
+    hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=4)).decode()
+    return prefix + hashed[4:]
+
+
+@pytest.fixture
+def users(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(mongo, "database", FakeDB(users=collection))
+    auth._verify_cache.clear()
+    return collection
+
+
+def _add_user(users, password_hash):
+    now = datetime(2025, 1, 1)
+    doc = {"_id": ObjectId(), "email": "u@example.com", "display_name": "U", "password_hash": password_hash, "created_at": now, "updated_at": now}
+    users.docs.append(doc)
+    return doc
+
+
+def test_bcrypt_login_verifies_and_upgrades_to_argon2id(users):
+    doc = _add_user(users, _bcrypt_hash("hunter22"))
+
+    user = asyncio.run(auth.authenticate_user("u@example.com", "hunter22"))
+
+    assert user is not None and str(user.id) == str(doc["_id"])
+    assert doc["password_hash"].startswith("$argon2id$")
+    assert auth.verify_password("hunter22", doc["password_hash"])
+    assert not auth.password_hash_needs_update(doc["password_hash"])
+
+
+def test_wrong_password_does_not_upgrade(users):
+    legacy = _bcrypt_hash("hunter22")
+    doc = _add_user(users, legacy)
+
+    assert asyncio.run(auth.authenticate_user("u@example.com", "wrong")) is None
+    assert doc["password_hash"] == legacy
+
+
+@pytest.mark.parametrize("prefix", ["$2y$", "$2x$"])
+def test_legacy_bcrypt_prefixes_verify(prefix):
+    hashed = _bcrypt_hash("hunter22", prefix)
+    assert auth.verify_password("hunter22", hashed)
+    assert not auth.verify_password("hunter23", hashed)
+    assert auth.password_hash_needs_update(hashed)
+
+
+def test_verify_cache_only_keeps_successes(monkeypatch):
+    auth._verify_cache.clear()
+    hashed = _bcrypt_hash("hunter22")
+    calls = []
+    real_verify = auth.verify_password
+    monkeypatch.setattr(auth, "verify_password", lambda p, h: calls.append(p) or real_verify(p, h))
+
+    async def run():
+        return [await auth.verify_password_async(p, hashed) for p in ("wrong", "wrong", "hunter22", "hunter22")]
+
+    assert asyncio.run(run()) == [False, False, True, True]
+    # Each failure pays the KDF again; the second success is served from the cache
+    assert calls == ["wrong", "wrong", "hunter22"]
+    assert len(auth._verify_cache) == 1
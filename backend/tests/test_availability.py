@@ -20,6 +20,9 @@ class _FakeFindCursor:
         except StopIteration:
             raise StopAsyncIteration
 
+    async def to_list(self, length=None):
+        return list(self._docs) if length is None else self._docs[:length]
+
 
 def _normalize_dt(dt: datetime) -> datetime:
     if dt.tzinfo is None:
@@ -54,7 +57,10 @@ def _matches_condition(doc, cond):
         if isinstance(v, dict):
             for op, op_val in v.items():
                 if op == "$in":
-                    if not isinstance(doc_val, list) or not any(x in doc_val for x in op_val):
+                    if isinstance(doc_val, list):
+                        if not any(x in doc_val for x in op_val):
+                            return False
+                    elif doc_val not in op_val:
                         return False
                 elif op == "$lt":
                     if not _compare_dt(doc_val, op_val, op):
@@ -89,13 +95,13 @@ class _FakeCollection:
     def __init__(self, docs):
         self._docs = list(docs)
 
-    async def find_one(self, query):
+    async def find_one(self, query, projection=None):
         for doc in self._docs:
             if _matches_query(doc, query):
                 return doc
         return None
 
-    def find(self, query):
+    def find(self, query, projection=None):
         matched = [doc for doc in self._docs if _matches_query(doc, query)]
         return _FakeFindCursor(matched)
 
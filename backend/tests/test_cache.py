@@ -0,0 +1,46 @@
+import asyncio
+from datetime import datetime
+
+import orjson
+
+from app.cache import CacheManager
+
+
+class _JsonCache:
+    """L2 stand-in that round-trips values through JSON, as the Redis serializer does."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        raw = self.data.get(key)
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set(self, key, value, ttl=None):
+        self.data[key] = orjson.dumps(value, option=orjson.OPT_NAIVE_UTC)
+
+
+def _manager():
+    manager = CacheManager()
+    manager.cache = _JsonCache()
+    manager._initialized = True
+    return manager
+
+
+def test_l1_hits_are_copies_with_the_same_types_as_l2_hits():
+    async def run():
+        writer, reader = _manager(), _manager()
+        reader.cache = writer.cache
+        value = {"when": datetime(2025, 1, 1, 9), "tags": ["a"]}
+        await writer.set("k", value)
+        value["tags"].append("mutated-after-set")
+
+        from_l1 = await writer.get("k")
+        from_l2 = await reader.get("k")
+        from_l1["tags"].append("mutated-after-get")
+        return from_l1, from_l2, await writer.get("k")
+
+    from_l1, from_l2, again = asyncio.run(run())
+    assert from_l2 == {"when": "2025-01-01T09:00:00+00:00", "tags": ["a"]}
+    assert again == from_l2
+    assert from_l1["when"] == from_l2["when"]
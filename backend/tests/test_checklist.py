@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models import User
+from app.routers import events as events_router
+from app.service_layer.checklist_service import ChecklistService
+
+from fake_mongo import FakeCollection, FakeDB
+
+
+def _user():
+    now = datetime.now(timezone.utc)
+    return User(id=str(ObjectId()), email="u@example.com", display_name="U", created_at=now, updated_at=now)
+
+
+def _client(fake_db, user):
+    app = FastAPI()
+    app.include_router(events_router.router, prefix="/api")
+    app.dependency_overrides[events_router.get_current_user] = lambda: user
+    app.dependency_overrides[events_router.get_checklist_service] = lambda: ChecklistService(fake_db)
+    return TestClient(app)
+
+
+@pytest.fixture
+def user():
+    return _user()
+
+
+@pytest.fixture
+def event_id(user):
+    return ObjectId()
+
+
+@pytest.fixture
+def fake_db(user, event_id):
+    uid = str(user.id)
+    return FakeDB(events=FakeCollection([{"_id": event_id, "created_by": uid, "attendees": [uid]}]))
+
+
+def test_create_item_stores_assigned_to_as_object_id(fake_db, user, event_id):
+    assignee = ObjectId()
+    resp = _client(fake_db, user).post(f"/api/events/{event_id}/checklist", json={"title": "Tent", "assigned_to": str(assignee)})
+    assert resp.status_code == 200
+    assert resp.json()["data"]["assigned_to"] == str(assignee)
+
+    stored = fake_db.event_checklist_items.docs[0]
+    assert stored["assigned_to"] == assignee
+    assert stored["event_id"] == str(event_id)
+
+
+def test_list_items_denied_returns_403_and_no_items(fake_db, user, event_id):
+    other = str(ObjectId())
+    fake_db.events.docs[0].update(created_by=other, attendees=[other])
+    fake_db.event_checklist_items.docs.append({"_id": ObjectId(), "event_id": str(event_id), "title": "Secret", "created_by": other, "created_at": datetime(2025, 1, 1)})
+
+    resp = _client(fake_db, user).get(f"/api/events/{event_id}/checklist")
+    assert resp.status_code == 403
+    assert "Secret" not in resp.text
@@ -0,0 +1,59 @@
+import asyncio
+
+from pymongo.errors import OperationFailure
+
+from app import database as mongo
+
+
+class _IndexCollection:
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.created = []
+        self.create_error = None
+
+    async def create_indexes(self, models):
+        if self.create_error:
+            raise self.create_error
+        self.created.extend(m.document["name"] for m in models)
+
+    async def drop_index(self, name):
+        if name not in self.existing:
+            raise OperationFailure("index not found with name [%s]" % name, code=27)
+        self.existing.remove(name)
+
+
+class _IndexDB(dict):
+    def __getattr__(self, name):
+        return self.setdefault(name, _IndexCollection())
+
+    def __getitem__(self, name):
+        return self.__getattr__(name)
+
+
+def test_create_indexes_drops_superseded_ones(monkeypatch, capsys):
+    db = _IndexDB()
+    db.events.existing.update({"_id_", "created_by_1", "attendees_1_start_time_-1", "end_time_1"})
+    monkeypatch.setattr(mongo, "database", db)
+
+    asyncio.run(mongo.create_database_indexes())
+
+    assert "created_by_1_start_time_1_end_time_1" in db.events.created
+    # Superseded indexes are gone, current ones stay, and already-missing names are not an error
+    assert db.events.existing == {"_id_", "end_time_1"}
+    assert "event_id_1__id_1" in db.event_messages.created
+    assert "created successfully" in capsys.readouterr().out
+
+
+def test_failed_create_keeps_that_collections_old_indexes_only(monkeypatch, capsys):
+    db = _IndexDB()
+    db.events.existing.update({"_id_", "created_by_1"})
+    db.events.create_error = OperationFailure("index build failed", code=67)
+    db.tasks.existing.update({"_id_", "created_by_1"})
+    monkeypatch.setattr(mongo, "database", db)
+
+    asyncio.run(mongo.create_database_indexes())
+
+    assert db.events.existing == {"_id_", "created_by_1"}
+    assert db.tasks.existing == {"_id_"}
+    out = capsys.readouterr().out
+    assert "Error creating events indexes" in out and "created successfully" not in out
@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import email
+from app.models import User
+from app.routers import partner as partner_router
+from app.service_layer import partner_service as partner_service_module
+from app.service_layer.partner_service import PartnerService
+
+from fake_mongo import FakeDB
+
+
+def test_queue_email_without_workers_keeps_the_send_task_until_done(monkeypatch):
+    sent = []
+
+    async def fake_send_email(**message):
+        await asyncio.sleep(0)
+        sent.append(message["to_email"])
+        return True
+
+    monkeypatch.setattr(email, "send_email", fake_send_email)
+
+    async def run():
+        email.queue_email(to_email="a@example.com", subject="s", body_text="t")
+        assert len(email._detached_sends) == 1
+        await asyncio.gather(*email._detached_sends)
+
+    asyncio.run(run())
+    assert sent == ["a@example.com"]
+    assert not email._detached_sends
+
+
+def test_generate_invite_emails_the_link_when_an_invitee_is_given(monkeypatch):
+    queued = []
+    monkeypatch.setattr(partner_service_module, "queue_partnership_invitation", lambda *args: queued.append(args))
+    now = datetime.now(timezone.utc)
+    user = User(id=str(ObjectId()), email="u@example.com", display_name="Ana", created_at=now, updated_at=now)
+    app = FastAPI()
+    app.include_router(partner_router.router, prefix="/api")
+    app.dependency_overrides[partner_router.get_current_user] = lambda: user
+    app.dependency_overrides[partner_router.get_partner_service] = lambda: PartnerService(FakeDB())
+    client = TestClient(app)
+
+    assert client.post("/api/partner/generate-invite", json={}).status_code == 200
+    assert queued == []
+
+    resp = client.post("/api/partner/generate-invite", json={"invitee_email": "b@example.com"})
+    assert resp.status_code == 200
+    assert queued == [("Ana", "b@example.com", resp.json()["data"]["invite_url"])]
+
+
+def _sent_message(monkeypatch, **kwargs):
+    sent = []
+
+    async def capture(msg):
+        sent.append(msg)
+
+    monkeypatch.setattr(email, "_SMTP", ("smtp.example.com", "loom@example.com") + email._SMTP[2:])
+    monkeypatch.setattr(email.smtp_pool, "send_message", capture)
+    kwargs = {"to_email": "a@example.com", "subject": "s", **kwargs}
+    assert asyncio.run(email.send_email(**kwargs))
+    return sent[0]
+
+
+def test_html_with_the_same_text_is_sent_as_a_single_part(monkeypatch):
+    msg = _sent_message(
+        monkeypatch,
+        body_text="Hello Ana & Ben,\nsee you soon.",
+        body_html="<html><head><style>p {color: red}</style></head><body><p>Hello Ana &amp; Ben,</p> <p>see you soon.</p></body></html>",
+    )
+    assert msg.get_content_type() == "text/html"
+
+
+def test_html_with_more_content_keeps_the_text_alternative(monkeypatch):
+    msg = _sent_message(monkeypatch, **email._partnership_invitation_kwargs("Ana", "b@example.com", "https://x/invite/t"))
+    assert msg.get_content_type() == "multipart/alternative"
+    assert [part.get_content_type() for part in msg.iter_parts()] == ["text/plain", "text/html"]
+
+
+class _HangingClient:
+    is_connected = True
+    closed = False
+
+    async def send_message(self, msg):
+        await asyncio.sleep(60)
+
+    def close(self):
+        self.closed = True
+        self.is_connected = False
+
+
+def test_cancelled_send_closes_the_connection_and_keeps_the_pool_size(monkeypatch):
+    pool = email.SMTPPool(size=2)
+    client = _HangingClient()
+
+    async def connect():
+        return client
+
+    monkeypatch.setattr(pool, "_connect", connect)
+
+    async def run():
+        task = asyncio.create_task(pool.send_message(email.EmailMessage()))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return [pool._queue().get_nowait() for _ in range(pool._queue().qsize())]
+
+    slots = asyncio.run(run())
+    assert client.closed
+    assert slots == [(None, 0), (None, 0)]
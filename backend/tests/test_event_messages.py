@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models import User
+from app.routers import events as events_router
+from app.service_layer.event_messages_service import EventMessagesService
+
+from fake_mongo import FakeCollection, FakeDB
+
+_BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _user():
+    return User(id=str(ObjectId()), email="u@example.com", display_name="U", created_at=_BASE, updated_at=_BASE)
+
+
+@pytest.fixture
+def user():
+    return _user()
+
+
+@pytest.fixture
+def event_id():
+    return ObjectId()
+
+
+@pytest.fixture
+def message_ids():
+    # Ascending ids in creation order, as the server generates them
+    return [ObjectId.from_datetime(_BASE + timedelta(seconds=i)) for i in range(5)]
+
+
+@pytest.fixture
+def client(user, event_id, message_ids):
+    uid = str(user.id)
+    messages = [
+        {"_id": oid, "event_id": str(event_id), "sender_id": uid, "message": f"m{i}", "created_at": _BASE, "updated_at": _BASE}
+        for i, oid in enumerate(message_ids)
+    ]
+    messages.append({**messages[0], "_id": ObjectId(), "event_id": str(ObjectId()), "message": "other event"})
+    fake_db = FakeDB(
+        events=FakeCollection([{"_id": event_id, "created_by": uid, "attendees": [uid]}]),
+        event_messages=FakeCollection(messages),
+    )
+    app = FastAPI()
+    app.include_router(events_router.router, prefix="/api")
+    app.dependency_overrides[events_router.get_current_user] = lambda: user
+    app.dependency_overrides[events_router.get_event_messages_service] = lambda: EventMessagesService(fake_db)
+    return TestClient(app)
+
+
+def _texts(resp):
+    assert resp.status_code == 200
+    return [m["message"] for m in resp.json()["data"]]
+
+
+def test_default_page_is_every_message_oldest_first(client, event_id):
+    assert _texts(client.get(f"/api/events/{event_id}/messages")) == ["m0", "m1", "m2", "m3", "m4"]
+
+
+def test_limit_returns_the_newest_page_in_chronological_order(client, event_id):
+    assert _texts(client.get(f"/api/events/{event_id}/messages", params={"limit": 2})) == ["m3", "m4"]
+
+
+def test_before_pages_backwards_without_overlap(client, event_id, message_ids):
+    url = f"/api/events/{event_id}/messages"
+    assert _texts(client.get(url, params={"limit": 2, "before": str(message_ids[3])})) == ["m1", "m2"]
+    # The last page is short, and nothing is older than the first message
+    assert _texts(client.get(url, params={"limit": 2, "before": str(message_ids[1])})) == ["m0"]
+    assert _texts(client.get(url, params={"before": str(message_ids[0])})) == []
+
+
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": 501}])
+def test_limit_out_of_bounds_is_rejected(client, event_id, params):
+    assert client.get(f"/api/events/{event_id}/messages", params=params).status_code == 422
+
+
+def test_invalid_before_id_is_a_400(client, event_id):
+    resp = client.get(f"/api/events/{event_id}/messages", params={"before": "not-an-id"})
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Invalid message ID"
@@ -0,0 +1,188 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.models import User
+from app.routers import events as events_router
+from app.service_layer import events_service as events_service_module
+from app.service_layer.events_service import EventsService, fetch_with_event_access
+
+from fake_mongo import FakeCollection, FakeDB
+
+
+def _user(user_id=None):
+    now = datetime.now(timezone.utc)
+    return User(id=user_id or str(ObjectId()), email="u@example.com", display_name="U", created_at=now, updated_at=now)
+
+
+def _event_doc(created_by, updated_at, **extra):
+    start = datetime(2030, 1, 1, 9, tzinfo=timezone.utc)
+    doc = {
+        "_id": ObjectId(),
+        "title": "Event",
+        "start_time": start,
+        "end_time": start + timedelta(hours=1),
+        "visibility": "shared",
+        "attendees": [created_by],
+        "reminders": [],
+        "timezone": "UTC",
+        "created_by": created_by,
+        "created_at": updated_at,
+        "updated_at": updated_at,
+    }
+    doc.update(extra)
+    return doc
+
+
+def _client(fake_db, user):
+    app = FastAPI()
+    app.include_router(events_router.router, prefix="/api")
+    app.dependency_overrides[events_router.get_current_user] = lambda: user
+    app.dependency_overrides[events_router.get_events_service] = lambda: EventsService(fake_db)
+    return TestClient(app)
+
+
+@pytest.fixture
+def user():
+    return _user()
+
+
+@pytest.fixture
+def fake_db(user):
+    uid = str(user.id)
+    return FakeDB(events=FakeCollection([
+        _event_doc(uid, datetime(2025, 1, 1)),
+        _event_doc(uid, datetime(2025, 1, 2)),
+        _event_doc(str(ObjectId()), datetime(2025, 1, 3)),  # someone else's event
+    ]))
+
+
+def test_get_events_returns_etag_and_304_when_unchanged(fake_db, user):
+    client = _client(fake_db, user)
+    resp = client.get("/api/events")
+    assert resp.status_code == 200
+    assert len(resp.json()["data"]) == 2
+    etag = resp.headers["etag"]
+
+    again = client.get("/api/events", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    stale = client.get("/api/events", headers={"If-None-Match": 'W/"stale"'})
+    assert stale.status_code == 200
+    assert stale.headers["etag"] == etag
+
+
+def test_create_update_delete_each_change_the_etag(fake_db, user):
+    client = _client(fake_db, user)
+    etags = [client.get("/api/events").headers["etag"]]
+
+    created = client.post("/api/events", json={
+        "title": "New",
+        "start_time": "2030-02-01T10:00:00Z",
+        "end_time": "2030-02-01T11:00:00Z",
+    })
+    assert created.status_code == 200
+    event_id = created.json()["data"]["id"]
+    etags.append(client.get("/api/events").headers["etag"])
+
+    assert client.put(f"/api/events/{event_id}", json={"title": "Renamed"}).status_code == 200
+    etags.append(client.get("/api/events").headers["etag"])
+
+    assert client.delete(f"/api/events/{event_id}").status_code == 200
+    etags.append(client.get("/api/events").headers["etag"])
+
+    # Every write changes the fingerprint, and a stale one is answered with the full list
+    assert len(set(etags[:3])) == 3 and etags[3] != etags[2]
+    resp = client.get("/api/events", headers={"If-None-Match": etags[1]})
+    assert resp.status_code == 200
+
+
+@pytest.mark.parametrize("updated_at", [
+    [datetime(2025, 1, 1), datetime(2025, 3, 1)],
+    [datetime(2025, 1, 1), "2025-06-01T00:00:00Z"],  # legacy string mixed with dates
+    ["2025-01-01T00:00:00Z", "2025-06-01T00:00:00Z"],  # only legacy strings
+])
+def test_aggregate_and_full_path_produce_the_same_etag(user, updated_at):
+    uid = str(user.id)
+    fake_db = FakeDB(events=FakeCollection([_event_doc(uid, value) for value in updated_at]))
+    client = _client(fake_db, user)
+
+    full = client.get("/api/events")
+    assert full.status_code == 200
+    # Any If-None-Match routes through the aggregation; the real ETag must then match it
+    assert client.get("/api/events", headers={"If-None-Match": 'W/"x"'}).headers["etag"] == full.headers["etag"]
+    assert client.get("/api/events", headers={"If-None-Match": full.headers["etag"]}).status_code == 304
+
+
+def _ws_close_code(monkeypatch, user, access):
+    async def fake_user_ws(token):
+        if isinstance(user, Exception):
+            raise user
+        return user
+
+    async def fake_event_access(db, event_id):
+        if isinstance(access, Exception):
+            raise access
+        return access
+
+    monkeypatch.setattr(events_router, "get_current_user_ws", fake_user_ws)
+    monkeypatch.setattr(events_router, "get_event_access", fake_event_access)
+    app = FastAPI()
+    app.include_router(events_router.router, prefix="/api")
+    with TestClient(app).websocket_connect(f"/api/events/{ObjectId()}/ws?token=t") as ws:
+        return ws.receive()["code"]
+
+
+def test_event_websocket_close_codes(monkeypatch, user):
+    uid = str(user.id)
+    other = str(ObjectId())
+    assert _ws_close_code(monkeypatch, None, (uid, frozenset([uid]))) == 4001
+    assert _ws_close_code(monkeypatch, user, None) == 1003
+    assert _ws_close_code(monkeypatch, user, (other, frozenset([other]))) == 4003
+    assert _ws_close_code(monkeypatch, user, RuntimeError("mongo down")) == 1011
+
+
+def test_create_event_stores_attendee_ids_as_strings(fake_db, user):
+    other = str(ObjectId())
+    resp = _client(fake_db, user).post("/api/events", json={
+        "title": "Dinner",
+        "start_time": "2030-02-01T18:00:00Z",
+        "end_time": "2030-02-01T20:00:00Z",
+        "attendees": [other],
+    })
+    assert resp.status_code == 200
+    stored = fake_db.events.docs[-1]
+    assert stored["attendees"] == [other, str(user.id)]
+    assert resp.json()["data"]["attendees"] == [other, str(user.id)]
+
+
+def test_fetch_with_event_access_cancels_the_fetch_when_denied(monkeypatch, user):
+    fetch_cancelled = False
+
+    async def denied_after_a_round_trip(db, event_oid, user_id):
+        await asyncio.sleep(0)  # let the fetch start, as it would while the ACL query is in flight
+        raise HTTPException(status_code=403, detail="Access denied to this event")
+
+    async def slow_fetch():
+        nonlocal fetch_cancelled
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            fetch_cancelled = True
+            raise
+        return ["secret"]
+
+    async def run():
+        with pytest.raises(HTTPException) as exc:
+            await fetch_with_event_access(FakeDB(), ObjectId(), str(user.id), slow_fetch())
+        return exc.value.status_code
+
+    monkeypatch.setattr(events_service_module, "assert_event_access", denied_after_a_round_trip)
+    assert asyncio.run(run()) == 403
+    assert fetch_cancelled
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from app import reminders
+
+from fake_mongo import FakeCollection, FakeCursor, FakeDB
+
+
+class _DueEvents:
+    """Stands in for db.events: aggregate() yields the already-expanded due reminders."""
+
+    def __init__(self, due):
+        self.due = due
+
+    def aggregate(self, pipeline):
+        return FakeCursor(self.due)
+
+
+def _due(event_id, attendee, minutes=15):
+    start = datetime(2030, 1, 1, 9, tzinfo=timezone.utc)
+    return {"_id": event_id, "title": "Standup", "start_time": start, "reminders": minutes, "attendees": attendee}
+
+
+def test_duplicate_key_in_batch_does_not_stop_the_rest(caplog):
+    event_id = ObjectId()
+    already_sent, fresh_a, fresh_b = (str(ObjectId()) for _ in range(3))
+    notifications = FakeCollection(unique=("user_id", "dedupe_key"))
+    notifications.docs.append(reminders._build_reminder_notification(already_sent, {"_id": event_id}, 15))
+    db = FakeDB(
+        events=_DueEvents([_due(event_id, fresh_a), _due(event_id, already_sent), _due(event_id, fresh_b)]),
+        notification_events=notifications,
+    )
+
+    with caplog.at_level(logging.ERROR, logger=reminders.__name__):
+        asyncio.run(reminders._send_due_reminders(db, datetime.now(timezone.utc), timedelta(hours=2), 60))
+
+    sent_to = sorted(str(d["user_id"]) for d in notifications.docs)
+    assert sent_to == sorted([already_sent, fresh_a, fresh_b])
+    # The duplicate is the unique index doing its job, not an error
+    assert caplog.records == []
+
+
+def test_malformed_attendee_is_skipped_with_a_lazy_log(caplog):
+    event_id = ObjectId()
+    good = str(ObjectId())
+    db = FakeDB(events=_DueEvents([_due(event_id, "not-an-id"), _due(event_id, good)]))
+
+    with caplog.at_level(logging.ERROR, logger=reminders.__name__):
+        asyncio.run(reminders._send_due_reminders(db, datetime.now(timezone.utc), timedelta(hours=2), 60))
+
+    assert [str(d["user_id"]) for d in db.notification_events.docs] == [good]
+    (record,) = caplog.records
+    assert record.msg == "Reminder skipped for event %s user %s: %s"
+    assert record.args[:2] == (event_id, "not-an-id")